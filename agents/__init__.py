@@ -5,6 +5,15 @@ Contains all AI agents for NMAP-AI
 FILE LOCATION: NMAP-AI/agents/__init__.py
 """
 
-from . import comprehension
+import importlib
 
-__all__ = ['comprehension']
\ No newline at end of file
+__all__ = ['comprehension']
+
+
+def __getattr__(name):
+    # Imported on first access so that e.g. agents.validator does not load it.
+    # Not "from . import comprehension": that looks the attribute up first,
+    # which comes back here before the submodule is set on the package.
+    if name == 'comprehension':
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,7 +3,6 @@ Comprehension Agent Package
 Handles query understanding, relevance detection, and complexity classification.
 """
 
-from .classifier import NmapQueryClassifier, get_classifier
 from .kg_utils import Neo4jClient, NmapOption, get_kg_client
 
 __all__ = [
@@ -12,4 +11,12 @@ __all__ = [
     'Neo4jClient',
     'NmapOption',
     'get_kg_client',
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # The classifier pulls in scikit-learn; load it on first use only
+    if name in ('NmapQueryClassifier', 'get_classifier'):
+        from . import classifier
+        return getattr(classifier, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,6 +5,7 @@ Handles relevance detection and complexity classification for nmap queries.
 
 import json
 import re
+import threading
 from pathlib import Path
 from typing import Literal, Tuple, Dict, List
 import joblib
@@ -233,14 +234,20 @@ class NmapQueryClassifier:
 
 # Singleton instance
 _classifier = None
+_classifier_lock = threading.Lock()
 
 def get_classifier() -> NmapQueryClassifier:
-    """Get or create the classifier singleton."""
+    """Get or create the classifier singleton (thread-safe)."""
     global _classifier
     if _classifier is None:
-        _classifier = NmapQueryClassifier()
-        try:
-            _classifier.load_models()
-        except FileNotFoundError:
-            print("Warning: Models not found. Please train first.")
+        with _classifier_lock:
+            if _classifier is None:
+                classifier = NmapQueryClassifier()
+                try:
+                    classifier.load_models()
+                except FileNotFoundError:
+                    print("Warning: Models not found. Please train first.")
+                # Published only once loaded, so other threads never see
+                # a classifier without its models
+                _classifier = classifier
     return _classifier
\ No newline at end of file
@@ -3,9 +3,11 @@ Knowledge Graph Utilities
 Provides interface to Neo4j for nmap option querying and validation.
 """
 
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 import os
+import threading
+import time
 
 
 @dataclass
@@ -39,9 +41,13 @@ class Neo4jClient:
     #     self.driver = None
     #     self._connect()
 
+    # Seconds a conflict lookup from Neo4j is reused (the KG rarely changes)
+    CONFLICTS_TTL = 600
+    
     def __init__(self):
         """Initialize Neo4j client with current environment variables."""
         self.driver = None
+        self._conflicts_cache: Dict[str, Tuple[float, List[str]]] = {}
         self._connect()
     
     def _connect(self):
@@ -53,7 +59,15 @@ class Neo4jClient:
             user = os.getenv("NEO4J_USER", "neo4j")
             password = os.getenv("NEO4J_PASSWORD", "password123")
             
-            self.driver = GraphDatabase.driver(uri, auth=(user, password))
+            # Bounded pool: a burst of API requests waits for a free
+            # connection instead of opening new ones without limit
+            self.driver = GraphDatabase.driver(
+                uri,
+                auth=(user, password),
+                max_connection_pool_size=int(os.getenv("NEO4J_MAX_POOL_SIZE", 50)),
+                connection_acquisition_timeout=15,
+                max_connection_lifetime=3600
+            )
             
             # Test connection
             with self.driver.session() as session:
@@ -260,6 +274,21 @@ class Neo4jClient:
         
         print(f"✓ Loaded {len(self.fallback_options)} nmap options (fallback mode)")
     
+    def _read(self, query: str, params: Dict) -> list:
+        """
+        Run a read query on a pooled connection.
+        
+        driver.execute_query borrows a connection from the driver's pool,
+        retries transient errors and routes to a reader, instead of opening
+        a session per query.
+        """
+        from neo4j import RoutingControl
+        
+        records, _, _ = self.driver.execute_query(
+            query, params, routing_=RoutingControl.READ
+        )
+        return records
+    
     def get_options(
         self,
         requires_root: Optional[bool] = None,
@@ -289,52 +318,51 @@ class Neo4jClient:
         exclude_conflicts: Optional[List[str]]
     ) -> List[NmapOption]:
         """Query from Neo4j."""
-        with self.driver.session() as session:
-            query = "MATCH (o:Option) "
-            conditions = []
-            params = {}
-            
-            if requires_root is not None:
-                conditions.append("o.requires_root = $requires_root")
-                params["requires_root"] = requires_root
-            
-            if category:
-                conditions.append("o.category = $category")
-                params["category"] = category
-            
-            if conditions:
-                query += "WHERE " + " AND ".join(conditions) + " "
-            
-            query += """
-            OPTIONAL MATCH (o)-[:CONFLICTS_WITH]->(c:Option)
-            RETURN o.name as name, o.category as category, 
-                   o.description as description, o.requires_root as requires_root,
-                   o.requires_args as requires_args, o.example as example,
-                   collect(c.name) as conflicts
-            """
-            
-            result = session.run(query, params)
+        query = "MATCH (o:Option) "
+        conditions = []
+        params = {}
+        
+        if requires_root is not None:
+            conditions.append("o.requires_root = $requires_root")
+            params["requires_root"] = requires_root
+        
+        if category:
+            conditions.append("o.category = $category")
+            params["category"] = category
+        
+        if conditions:
+            query += "WHERE " + " AND ".join(conditions) + " "
+        
+        query += """
+        OPTIONAL MATCH (o)-[:CONFLICTS_WITH]->(c:Option)
+        RETURN o.name as name, o.category as category, 
+               o.description as description, o.requires_root as requires_root,
+               o.requires_args as requires_args, o.example as example,
+               collect(c.name) as conflicts
+        """
+        
+        records = self._read(query, params)
+        
+        options = []
+        for record in records:
+            conflicts = [c for c in record["conflicts"] if c]
             
-            options = []
-            for record in result:
-                conflicts = [c for c in record["conflicts"] if c]
-                
-                # Filter out conflicting options
-                if exclude_conflicts:
-                    if any(c in exclude_conflicts for c in conflicts):
-                        continue
-                
-                options.append(NmapOption(
-                    name=record["name"],
-                    category=record["category"],
-                    description=record["description"],
-                    requires_root=record["requires_root"],
-                    requires_args=record["requires_args"],
-                    conflicts_with=conflicts,
-                    example=record["example"]
-                ))
+            # Filter out conflicting options
+            if exclude_conflicts:
+                if any(c in exclude_conflicts for c in conflicts):
+                    continue
             
-            return options
+            options.append(NmapOption(
+                name=record["name"],
+                category=record["category"],
+                description=record["description"],
+                requires_root=record["requires_root"],
+                requires_args=record["requires_args"],
+                conflicts_with=conflicts,
+                example=record["example"]
+            ))
+        
+        return options
     
     def _get_options_fallback(
         self,
@@ -371,26 +399,39 @@ class Neo4jClient:
             List of conflicting option names
         """
         if self.driver:
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (o:Option {name: $option})-[:CONFLICTS_WITH]->(c:Option)
-                    RETURN c.name as conflict
-                    """,
-                    option=option
-                )
-                return [record["conflict"] for record in result]
+            now = time.monotonic()
+            hit = self._conflicts_cache.get(option)
+            if hit is not None and hit[0] > now:
+                return list(hit[1])
+            
+            records = self._read(
+                """
+                MATCH (o:Option {name: $option})-[:CONFLICTS_WITH]->(c:Option)
+                RETURN c.name as conflict
+                """,
+                {"option": option}
+            )
+            conflicts = [record["conflict"] for record in records]
+            if len(self._conflicts_cache) >= 512:
+                self._conflicts_cache.clear()
+            self._conflicts_cache[option] = (now + self.CONFLICTS_TTL, conflicts)
+            return list(conflicts)
         else:
             if option in self.fallback_options:
                 return self.fallback_options[option].conflicts_with
             return []
     
-    def validate_command_conflicts(self, flags: List[str]) -> Dict[str, List[str]]:
+    def validate_command_conflicts(
+        self,
+        flags: List[str],
+        stop_at_first: bool = False
+    ) -> Dict[str, List[str]]:
         """
         Check for conflicts in a list of flags.
         
         Args:
             flags: List of nmap flags
+            stop_at_first: Stop querying after the first conflicting flag
             
         Returns:
             Dict mapping each conflicting flag to its conflicts found in the command
@@ -403,6 +444,8 @@ class Neo4jClient:
             found_conflicts = [c for c in conflicts if c in flag_set]
             if found_conflicts:
                 conflicts_found[flag] = found_conflicts
+                if stop_at_first:
+                    break
         
         return conflicts_found
     
@@ -436,7 +479,32 @@ def get_kg_client() -> Neo4jClient:
     return Neo4jClient()
 
 
-@dataclass
+# Client shared by the module-level helpers below. It is reused while the
+# NEO4J_* settings stay the same and replaced when they change; set
+# _kg_client = None to force a reconnect.
+_kg_client = None
+_kg_client_settings = None
+_kg_client_lock = threading.Lock()
+
+
+def _shared_kg_client() -> Neo4jClient:
+    """Shared client (and driver pool) for get_options, get_conflicts, ..."""
+    global _kg_client, _kg_client_settings
+    settings = (
+        os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+        os.getenv("NEO4J_USER", "neo4j"),
+        os.getenv("NEO4J_PASSWORD", "password123"),
+    )
+    with _kg_client_lock:
+        if _kg_client is None or settings != _kg_client_settings:
+            if _kg_client is not None:
+                _kg_client.close()
+            _kg_client = Neo4jClient()
+            _kg_client_settings = settings
+        return _kg_client
+
+
+@dataclass(frozen=True)
 class Port:
     """Represents a port/service."""
     number: int
@@ -453,7 +521,7 @@ def get_options(
     exclude_conflicts: Optional[List[str]] = None
 ) -> List[NmapOption]:
     """Get nmap options from Knowledge Graph."""
-    client = get_kg_client()
+    client = _shared_kg_client()
     options = client.get_options(
         requires_root=requires_root,
         category=category,
@@ -491,35 +559,37 @@ def get_options(
 
 def get_conflicts(option: str) -> List[str]:
     """Get list of options that conflict with the given option."""
-    client = get_kg_client()
+    client = _shared_kg_client()
     return client.get_conflicts(option)
 
 
+# Well-known ports; built once instead of on every lookup
+PORTS = {
+    21: Port(21, "FTP", "TCP", "File Transfer Protocol"),
+    22: Port(22, "SSH", "TCP", "Secure Shell"),
+    23: Port(23, "Telnet", "TCP", "Telnet"),
+    25: Port(25, "SMTP", "TCP", "Simple Mail Transfer Protocol"),
+    53: Port(53, "DNS", "TCP/UDP", "Domain Name System"),
+    80: Port(80, "HTTP", "TCP", "Hypertext Transfer Protocol"),
+    443: Port(443, "HTTPS", "TCP", "HTTP Secure"),
+    161: Port(161, "SNMP", "UDP", "Simple Network Management Protocol"),
+    3306: Port(3306, "MySQL", "TCP", "MySQL Database"),
+    3389: Port(3389, "RDP", "TCP", "Remote Desktop Protocol"),
+}
+_PORTS_BY_SERVICE = {p.service.upper(): p for p in PORTS.values()}
+
+
 def get_port_info(port: Optional[int] = None, service: Optional[str] = None) -> Port:
     """Get port information by number or service name."""
-    PORTS = {
-        21: Port(21, "FTP", "TCP", "File Transfer Protocol"),
-        22: Port(22, "SSH", "TCP", "Secure Shell"),
-        23: Port(23, "Telnet", "TCP", "Telnet"),
-        25: Port(25, "SMTP", "TCP", "Simple Mail Transfer Protocol"),
-        53: Port(53, "DNS", "TCP/UDP", "Domain Name System"),
-        80: Port(80, "HTTP", "TCP", "Hypertext Transfer Protocol"),
-        443: Port(443, "HTTPS", "TCP", "HTTP Secure"),
-        161: Port(161, "SNMP", "UDP", "Simple Network Management Protocol"),
-        3306: Port(3306, "MySQL", "TCP", "MySQL Database"),
-        3389: Port(3389, "RDP", "TCP", "Remote Desktop Protocol"),
-    }
-    
     if port is not None:
         if port in PORTS:
             return PORTS[port]
         raise ValueError(f"Port {port} not found")
     
     if service is not None:
-        service_upper = service.upper()
-        for p in PORTS.values():
-            if p.service.upper() == service_upper:
-                return p
+        info = _PORTS_BY_SERVICE.get(service.upper())
+        if info is not None:
+            return info
         raise ValueError(f"Service '{service}' not found")
     
     raise ValueError("Must provide either port or service")
@@ -527,7 +597,7 @@ def get_port_info(port: Optional[int] = None, service: Optional[str] = None) ->
 
 def validate_command_conflicts(flags: List[str]) -> Dict[str, List[str]]:
     """Check for conflicts in a list of flags."""
-    client = get_kg_client()
+    client = _shared_kg_client()
     return client.validate_command_conflicts(flags)
 
 
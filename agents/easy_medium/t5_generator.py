@@ -6,16 +6,36 @@ Intègre une couche de nettoyage anti-hallucination et des définitions de group
 """
 
 import re
+import sys
+import asyncio
 import logging
+import threading
+import importlib.util
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, List, Set
+from typing import Optional, List, Set, Tuple
+
+
+def _lazy_import(name: str):
+    """Module dont le vrai import est différé au premier accès d'attribut"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
 
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from peft import PeftModel
+
+# PyTorch (~2 s) n'est chargé qu'à la création du premier générateur;
+# transformers/peft sont importés dans _load_model
+torch = _lazy_import("torch")
 
 # Import du KG de P1
-import sys
 current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 if str(project_root) not in sys.path:
@@ -100,11 +120,20 @@ class T5NmapGenerator:
             if not self.adapter_path.exists():
                 raise FileNotFoundError(f"❌ Adapter introuvable: {self.adapter_path}")
 
+            from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+            from peft import PeftModel
+
             self.tokenizer = AutoTokenizer.from_pretrained(model_name)
             base_model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-            self.model = PeftModel.from_pretrained(base_model, str(self.adapter_path))
-            self.model.to(self.device)
-            self.model.eval()
+            model = PeftModel.from_pretrained(base_model, str(self.adapter_path))
+            # LoRA fusionné dans les poids: plus de couches adapter à chaque token
+            model = model.merge_and_unload()
+            if self.device == "cuda" and torch.cuda.is_bf16_supported():
+                # bf16 (pas fp16: T5 déborde en fp16) divise la bande passante par 2
+                model = model.to(self.device, dtype=torch.bfloat16)
+            else:
+                model = model.to(self.device)
+            self.model = model.eval()
             logger.info("✅ Modèle chargé (Mode Strict).")
         except Exception as e:
             logger.error(f"Erreur critique: {e}")
@@ -223,18 +252,32 @@ class T5NmapGenerator:
             query: Query utilisateur
             complexity: "EASY", "MEDIUM" ou "HARD"
         """
+        return self.generate_batch([query], [complexity])[0]
+
+    @staticmethod
+    def _prompt(query: str, complexity: str) -> str:
+        """Prompt du modèle pour une query (pré-traitement inclus)"""
+        clean_query = query.lower().replace(" and ", ", ").replace(" ports ", " port ")
+        return f"nmap conversion ({complexity}): {clean_query}"
+
+    def generate_batch(self, queries: List[str], complexities: List[str]) -> List[str]:
+        """
+        Générer plusieurs commandes en une seule passe du modèle.
+        
+        Les prompts sont paddés ensemble (l'attention mask ignore le padding),
+        puis chaque sortie passe par la même correction que generate().
+        
+        Args:
+            queries: Queries utilisateur
+            complexities: Complexité de chaque query ("EASY", "MEDIUM", "HARD")
+        """
         try:
-            # Pré-traitement
-            clean_query = query.lower().replace(" and ", ", ").replace(" ports ", " port ")
-            
-            # 🔥 ÉTAPE 3: Récupérer les flags autorisés du KG
-            allowed_flags = self._get_allowed_flags_from_kg(complexity)
-            
-            # Construire le prompt avec contraintes
-            input_text = f"nmap conversion ({complexity}): {clean_query}"
-            inputs = self.tokenizer(input_text, return_tensors="pt", truncation=True, max_length=128).to(self.device)
+            prompts = [self._prompt(q, c) for q, c in zip(queries, complexities)]
+            inputs = self.tokenizer(
+                prompts, return_tensors="pt", padding=True, truncation=True, max_length=128
+            ).to(self.device)
 
-            with torch.no_grad():
+            with torch.inference_mode():
                 outputs = self.model.generate(
                     **inputs,
                     max_new_tokens=128,
@@ -244,15 +287,18 @@ class T5NmapGenerator:
                     repetition_penalty=1.5
                 )
 
-            raw_cmd = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+            raw_cmds = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
             
-            # 🔥 ÉTAPE 3: Correction avec validation KG
-            final_cmd = self._strict_correction(raw_cmd, query, complexity, allowed_flags)
-            return final_cmd
+            # 🔥 ÉTAPE 3: Correction avec validation KG (flags autorisés par complexité)
+            return [
+                self._strict_correction(raw_cmd, query, complexity,
+                                        self._get_allowed_flags_from_kg(complexity))
+                for raw_cmd, query, complexity in zip(raw_cmds, queries, complexities)
+            ]
 
         except Exception as e:
             logger.error(f"Erreur génération: {e}")
-            return "nmap -sn 127.0.0.1"
+            return ["nmap -sn 127.0.0.1"] * len(queries)
 
     def _strict_correction(self, command: str, user_query: str, complexity: str, allowed_flags: List[str]) -> str:
         """
@@ -350,17 +396,156 @@ class T5NmapGenerator:
         cmd = re.sub(r'\s+', ' ', cmd).strip()
         return f"nmap {cmd}"
 
+
+DEFAULT_ADAPTER_PATH = Path(__file__).parent / "models" / "nmap_adapter_premium"
+
+
+# Générateurs chargés, du moins au plus récemment utilisé (un seul gardé,
+# comme l'ancien lru_cache(maxsize=1))
+GENERATORS_MAX = 1
+_generators: "OrderedDict[str, T5NmapGenerator]" = OrderedDict()
+_generators_lock = threading.Lock()
+
+
+def get_generator(adapter_path: str = str(DEFAULT_ADAPTER_PATH)) -> T5NmapGenerator:
+    """
+    Générateur partagé: le modèle est chargé une seule fois par processus.
+    
+    Les handlers appellent get_generator() au lieu de créer leur propre
+    T5NmapGenerator. Chargé avant le fork (gunicorn --preload), les poids
+    sont partagés en copy-on-write entre les workers (CPU uniquement).
+    
+    Verrouillage à double vérification: les appels suivants ne prennent pas
+    le verrou, et des premiers appels concurrents (threads) attendent un
+    seul chargement au lieu de charger chacun le modèle. Au-delà de
+    GENERATORS_MAX, le moins récemment utilisé est libéré (sous le verrou).
+    """
+    generator = _generators.get(adapter_path)
+    if generator is not None:
+        try:
+            _generators.move_to_end(adapter_path)
+        except KeyError:
+            pass  # évincé entre-temps par un autre thread
+        return generator
+    with _generators_lock:
+        generator = _generators.get(adapter_path)
+        if generator is None:
+            generator = T5NmapGenerator(adapter_path)
+            _generators[adapter_path] = generator
+            while len(_generators) > GENERATORS_MAX:
+                _generators.popitem(last=False)
+    return generator
+
+
+class BatchedGenerator:
+    """
+    Micro-batching des requêtes concurrentes vers un T5NmapGenerator.
+    
+    Les requêtes arrivées pendant max_wait_ms (ou jusqu'à max_batch) sont
+    générées ensemble par generate_batch(), dans un thread pour ne pas
+    bloquer l'event loop; chaque appelant récupère son résultat via un
+    Future.
+    
+    Usage (dans une app FastAPI):
+        batched = BatchedGenerator(get_generator())
+        command = await batched.generate(query, "EASY")
+    """
+
+    def __init__(self, generator: T5NmapGenerator, max_batch: int = 16, max_wait_ms: float = 10.0):
+        self.generator = generator
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def generate(self, query: str, complexity: str = "MEDIUM") -> str:
+        """Mettre une requête en file et attendre sa commande"""
+        if self._worker is None:
+            # Créés à la première requête, dans l'event loop du serveur
+            self.queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((query, complexity, future))
+        return await future
+
+    async def close(self) -> None:
+        """
+        Arrêter la tâche de fond
+        
+        Les requêtes en cours (lot courant et file d'attente) échouent avec
+        RuntimeError au lieu de rester bloquées jusqu'à l'arrêt du serveur.
+        """
+        if self._worker is None:
+            return
+        worker, self._worker = self._worker, None
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
+        while not self.queue.empty():
+            _, _, future = self.queue.get_nowait()
+            _fail_closed(future)
+
+    async def _drain(self, items: List[Tuple[str, str, asyncio.Future]]) -> None:
+        """
+        Attendre une requête puis collecter les suivantes pendant max_wait
+        
+        Les requêtes sont ajoutées à items au fur et à mesure, pour que
+        _run puisse les faire échouer si la tâche est annulée entre-temps.
+        """
+        items.append(await self.queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(items) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        while True:
+            items: List[Tuple[str, str, asyncio.Future]] = []
+            try:
+                await self._drain(items)
+                queries, complexities, futures = zip(*items)
+                commands = await asyncio.to_thread(
+                    self.generator.generate_batch, list(queries), list(complexities)
+                )
+            except asyncio.CancelledError:
+                # close(): le lot en cours ne sera jamais généré
+                for _, _, future in items:
+                    _fail_closed(future)
+                raise
+            except Exception as e:
+                for _, _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for future, command in zip(futures, commands):
+                if not future.done():
+                    future.set_result(command)
+
+
+def _fail_closed(future: asyncio.Future) -> None:
+    """Faire échouer une requête d'un BatchedGenerator arrêté"""
+    if not future.done():
+        future.set_exception(RuntimeError("generator closed"))
+
+
 # ================= TEST ÉTAPE 3 =================
 if __name__ == "__main__":
     print("\n" + "="*60)
     print("🧪 TEST ÉTAPE 3: get_options() pour filtrer les flags")
     print("="*60 + "\n")
     
-    script_dir = Path(__file__).parent
-    adapter_path = script_dir / "models" / "nmap_adapter_premium"
+    adapter_path = DEFAULT_ADAPTER_PATH
     
     if adapter_path.exists():
-        gen = T5NmapGenerator(str(adapter_path))
+        gen = get_generator()
         
         print("\n📊 État du générateur:")
         print(f"   KG disponible: {gen.kg_available}")
@@ -7,11 +7,38 @@ import torch
 from transformers import T5ForConditionalGeneration, T5Tokenizer
 from peft import PeftModel
 import os
-from typing import Optional, Dict, Any, List
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Hub cache for the base model; after the first download every load is local
+MODEL_CACHE_DIR = os.environ.get("NMAP_AI_MODEL_CACHE", "./models")
+
+# Literal words the model sometimes copies from the intent
+_BAD_WORDS = frozenset({'XML', 'output', 'common', 'ports', 'servers'})
+
+# Intent keywords, matched as whole tokens ('udp' must not match 'update')
+_INTENT_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_VULN_WORDS = frozenset({'vuln', 'vulns', 'vulnerable', 'vulnerability', 'vulnerabilities'})
+_BRUTE_WORDS = frozenset({'brute', 'bruteforce'})
+
+# Flags that require root privileges
+_SUDO_FLAGS = frozenset({
+    '-sU',  # UDP scan
+    '-sN',  # TCP Null scan
+    '-sF',  # FIN scan
+    '-sX',  # Xmas scan
+    '-sA',  # ACK scan
+    '-sW',  # Window scan
+    '-sM',  # Maimon scan
+    '--scanflags',  # Custom TCP scan
+    '-O',   # OS detection (usually requires root)
+})
+
 
 class HardGenerator:
     """
@@ -29,7 +56,8 @@ class HardGenerator:
         self,
         adapter_path: str = "./agents/hard/adapter",
         base_model: str = "t5-base",
-        device: Optional[str] = None
+        device: Optional[str] = None,
+        backend: str = "torch"
     ):
         """
         Initialize the hard generator
@@ -38,12 +66,19 @@ class HardGenerator:
             adapter_path: Path to LoRA adapter directory
             base_model: Base model name (default: t5-base)
             device: Device to use (cuda/cpu, auto-detected if None)
+            backend: "torch" (PEFT model) or "onnx" (ONNX Runtime, CPU only)
         """
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown backend '{backend}' (expected 'torch' or 'onnx')")
+
         self.adapter_path = adapter_path
         self.base_model = base_model
+        self.backend = backend
 
-        # Auto-detect device
-        if device is None:
+        # Auto-detect device (ONNX backend always runs on CPU)
+        if backend == "onnx":
+            self.device = "cpu"
+        elif device is None:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         else:
             self.device = device
@@ -52,7 +87,13 @@ class HardGenerator:
         self.tokenizer = None
         self.max_length = 256
 
-        logger.info(f"Initialized HardGenerator (device: {self.device})")
+        # Pinned host buffers for async host-to-device copies (CUDA only)
+        self._input_ids_buf = None
+        self._attn_buf = None
+        self._h2d_event = None
+        self._buf_lock = threading.Lock()
+
+        logger.info(f"Initialized HardGenerator (device: {self.device}, backend: {self.backend})")
 
     # def load_adapter(self) -> None:
     #     """Load the base model and LoRA adapter"""
@@ -90,11 +131,18 @@ class HardGenerator:
                 local_files_only=True
             )
 
+            if self.backend == "onnx":
+                from .t5_onnx import load_onnx_model
+                self.model = load_onnx_model(self.adapter_path, self.base_model)
+                return
+
             # Try to load base model from cache or local
             try:
                 base_model = T5ForConditionalGeneration.from_pretrained(
                     self.base_model,
                     torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
+                    cache_dir=MODEL_CACHE_DIR,
+                    use_safetensors=True,
                     local_files_only=True  # Only use cache
                 )
             except Exception as e:
@@ -102,7 +150,9 @@ class HardGenerator:
                 logger.info("Trying to download t5-base (may take a while)...")
                 base_model = T5ForConditionalGeneration.from_pretrained(
                     self.base_model,
-                    torch_dtype=torch.float16 if self.device == "cuda" else torch.float32
+                    torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
+                    cache_dir=MODEL_CACHE_DIR,
+                    use_safetensors=True
                 )
 
             # Load LoRA adapter
@@ -110,6 +160,14 @@ class HardGenerator:
             self.model = self.model.to(self.device)
             self.model.eval()
 
+            if self.device == "cuda":
+                self._input_ids_buf = torch.empty(
+                    1, self.max_length, dtype=torch.long, pin_memory=True
+                )
+                self._attn_buf = torch.empty(
+                    1, self.max_length, dtype=torch.long, pin_memory=True
+                )
+
             logger.info(f"✅ Hard generator loaded successfully on {self.device}")
 
         except Exception as e:
@@ -141,6 +199,26 @@ class HardGenerator:
         Returns:
             Generated Nmap command string
         """
+        command, _ = self.generate_with_flags(intent, kg_hints, max_new_tokens, num_beams)
+        return command
+
+    def generate_with_flags(
+        self,
+        intent: str,
+        kg_hints: Optional[Dict[str, Any]] = None,
+        max_new_tokens: int = 100,
+        num_beams: int = 4
+    ) -> Tuple[str, Tuple[str, ...]]:
+        """
+        Generate a command and return the flags collected while cleaning it
+
+        The flags (deduplicated, in the order found) can be handed to
+        validate_conflicts(..., flags=...) and check_requires_root(...,
+        flags=...) so the command is not re-parsed.
+
+        Returns:
+            (command, flags) tuple
+        """
         if self.model is None:
             raise RuntimeError("Model not loaded. Call load_adapter() first.")
 
@@ -153,12 +231,15 @@ class HardGenerator:
             input_text += f" (flags: {flags})"
 
         # Tokenize
-        inputs = self.tokenizer(
-            input_text,
-            return_tensors="pt",
-            max_length=self.max_length,
-            truncation=True
-        ).to(self.device)
+        if self._input_ids_buf is not None:
+            inputs = self._to_device_pinned(input_text)
+        else:
+            inputs = self.tokenizer(
+                input_text,
+                return_tensors="pt",
+                max_length=self.max_length,
+                truncation=True
+            ).to(self.device)
 
         # Generate
         with torch.no_grad():
@@ -173,16 +254,49 @@ class HardGenerator:
         # Decode
         command = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
 
-        # Clean and post-process
-        command = self._clean_command(command, intent)
+        # Clean and post-process (single pass also collects the flags)
+        command, flags = self._clean_command(command, intent)
 
         # Auto-add sudo if needed
-        if self._requires_sudo(command):
+        if self._requires_sudo(command, flags):
             command = f"sudo {command}"
 
-        return command.strip()
+        return command.strip(), flags
 
-    def _clean_command(self, cmd: str, intent: str) -> str:
+    def _to_device_pinned(self, input_text: str) -> Dict[str, "torch.Tensor"]:
+        """
+        Tokenize to a static shape and copy to the GPU through pinned buffers
+
+        Args:
+            input_text: Prompt for T5
+
+        Returns:
+            input_ids / attention_mask tensors on self.device
+        """
+        encoded = self.tokenizer(
+            input_text,
+            return_tensors="pt",
+            max_length=self.max_length,
+            truncation=True,
+            padding="max_length"
+        )
+
+        with self._buf_lock:
+            # Previous async copy must have drained the buffers before reuse
+            if self._h2d_event is not None:
+                self._h2d_event.synchronize()
+
+            self._input_ids_buf.copy_(encoded["input_ids"])
+            self._attn_buf.copy_(encoded["attention_mask"])
+            input_ids = self._input_ids_buf.to(self.device, non_blocking=True)
+            attention_mask = self._attn_buf.to(self.device, non_blocking=True)
+
+            self._h2d_event = torch.cuda.Event()
+            self._h2d_event.record()
+
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+    def _clean_command(self, cmd: str, intent: str) -> Tuple[str, Tuple[str, ...]]:
         """
         Clean and fix common generation errors
 
@@ -191,80 +305,72 @@ class HardGenerator:
             intent: Original intent
 
         Returns:
-            Cleaned command
+            (cleaned command, flags present in it, in the order found)
         """
-        # Remove literal words that shouldn't be in commands
-        bad_words = ['XML', 'output', 'common', 'ports', 'servers']
-        for word in bad_words:
-            if f' {word} ' in cmd or f' {word}' in cmd:
-                cmd = cmd.replace(f' {word}', '')
-
-        # Remove duplicate flags
-        parts = cmd.split()
-        seen_flags = set()
+        # One walk over the tokens: drop literal words that shouldn't be in
+        # commands, drop duplicate flags and collect the flags (in a dict, so
+        # their order, and messages built from them, do not depend on hashing)
+        seen_flags = {}
         cleaned = []
+        has_script = False
 
-        for part in parts:
+        for part in cmd.split():
+            if part in _BAD_WORDS:
+                continue
             if part.startswith('-'):
-                if part not in seen_flags:
-                    cleaned.append(part)
-                    seen_flags.add(part)
-            else:
-                cleaned.append(part)
+                if part in seen_flags:
+                    continue
+                seen_flags[part] = None
+                if part.startswith('--script'):
+                    has_script = True
+            cleaned.append(part)
 
         cmd = ' '.join(cleaned)
 
         # Add missing critical flags based on intent
-        intent_lower = intent.lower()
+        intent_tokens = set(_INTENT_TOKEN_RE.findall(intent.lower()))
 
         # UDP scans
-        if 'udp' in intent_lower and '-sU' not in cmd:
+        if 'udp' in intent_tokens and '-sU' not in seen_flags:
             cmd = cmd.replace('nmap', 'nmap -sU', 1)
+            seen_flags['-sU'] = None
 
         # XML output
-        if 'xml' in intent_lower and '-oX' not in cmd:
+        if 'xml' in intent_tokens and '-oX' not in seen_flags:
             cmd += ' -oX output.xml'
+            seen_flags['-oX'] = None
 
         # Scripts
-        if 'brute' in intent_lower and '--script' not in cmd:
-            if 'snmp' in intent_lower:
+        if not has_script and not _BRUTE_WORDS.isdisjoint(intent_tokens):
+            if 'snmp' in intent_tokens:
                 cmd = cmd.replace('nmap', 'nmap --script snmp-brute', 1)
-            elif 'ftp' in intent_lower:
+                has_script = True
+            elif 'ftp' in intent_tokens:
                 cmd = cmd.replace('nmap', 'nmap --script ftp-brute', 1)
+                has_script = True
 
-        if 'vuln' in intent_lower and '--script' not in cmd:
+        if not has_script and not _VULN_WORDS.isdisjoint(intent_tokens):
             cmd = cmd.replace('nmap', 'nmap --script vuln', 1)
+            has_script = True
+
+        if has_script:
+            seen_flags['--script'] = None
 
-        return cmd.strip()
+        return cmd.strip(), tuple(seen_flags)
 
-    def _requires_sudo(self, command: str) -> bool:
+    def _requires_sudo(self, command: str, flags: Tuple[str, ...]) -> bool:
         """
         Check if command requires sudo (e.g., UDP scans, raw packets)
 
         Args:
             command: The nmap command
+            flags: Flags collected by _clean_command
 
         Returns:
             True if sudo should be added
         """
         # Don't add sudo if already present
-        if command.startswith('sudo'):
-            return False
-
-        # Flags that require root privileges
-        root_flags = [
-            '-sU',  # UDP scan
-            '-sN',  # TCP Null scan
-            '-sF',  # FIN scan
-            '-sX',  # Xmas scan
-            '-sA',  # ACK scan
-            '-sW',  # Window scan
-            '-sM',  # Maimon scan
-            '--scanflags',  # Custom TCP scan
-            '-O',   # OS detection (usually requires root)
-        ]
-
-        return any(flag in command for flag in root_flags)
+        return not command.startswith('sudo') and not _SUDO_FLAGS.isdisjoint(flags)
 
     def batch_generate(
         self,
@@ -298,6 +404,39 @@ class HardGenerator:
         return commands
 
 
+# Loaded generators, least recently used first; each pair holds ~900 MB
+GENERATORS_MAX = 4
+_generators: "OrderedDict[Tuple[str, str], HardGenerator]" = OrderedDict()
+_generators_lock = threading.Lock()
+
+
+def _get_generator(adapter_path: str, base_model: str = "t5-base") -> HardGenerator:
+    """
+    Load each adapter once per process (a few adapters may coexist)
+    
+    Double-checked locking: loaded generators are returned without taking
+    the lock, and concurrent first calls wait for a single load. Past
+    GENERATORS_MAX, the least recently used one is dropped (under the lock).
+    """
+    key = (adapter_path, base_model)
+    generator = _generators.get(key)
+    if generator is not None:
+        try:
+            _generators.move_to_end(key)
+        except KeyError:
+            pass  # evicted meanwhile by another thread
+        return generator
+    with _generators_lock:
+        generator = _generators.get(key)
+        if generator is None:
+            generator = HardGenerator(adapter_path=adapter_path, base_model=base_model)
+            generator.load_adapter()
+            _generators[key] = generator
+            while len(_generators) > GENERATORS_MAX:
+                _generators.popitem(last=False)
+    return generator
+
+
 # Convenience function for quick usage
 def generate_hard(
     intent: str,
@@ -307,6 +446,8 @@ def generate_hard(
     """
     Quick function to generate a hard command without managing the generator object
 
+    The generator for ``adapter_path`` is loaded on first use and reused afterwards.
+
     Args:
         intent: Natural language description
         kg_hints: Optional KG hints
@@ -315,9 +456,7 @@ def generate_hard(
     Returns:
         Generated command
     """
-    generator = HardGenerator(adapter_path=adapter_path)
-    generator.load_adapter()
-    return generator.generate(intent, kg_hints=kg_hints)
+    return _get_generator(adapter_path).generate(intent, kg_hints=kg_hints)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,126 @@
+"""
+ONNX Runtime backend for the Hard Generator
+Place this in: agents/hard/t5_onnx.py
+
+CPU-only deployments get little out of eager PyTorch for T5-base, so the
+LoRA adapter is merged into the base weights once, exported to ONNX
+(encoder / decoder / decoder-with-past) and served through onnxruntime.
+The model stays in fp32: dynamic int8 quantization is usually slower on CPU
+for this model size.
+"""
+
+import os
+import shutil
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# Exported model lives next to the adapter so it is built only once
+ONNX_SUBDIR = "onnx"
+
+# Files a finished export contains (decoder_with_past_model.onnx as well)
+ONNX_FILES = ("encoder_model.onnx", "decoder_model.onnx")
+
+
+def _is_exported(onnx_dir: str) -> bool:
+    """Whether onnx_dir holds a complete export"""
+    return all(os.path.isfile(os.path.join(onnx_dir, f)) for f in ONNX_FILES)
+
+
+def _session_options() -> "ort.SessionOptions":
+    """Session options tuned for small-batch CPU inference"""
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    so.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+    return so
+
+
+def export_onnx_model(adapter_path: str, base_model: str, output_dir: str) -> None:
+    """
+    Merge the LoRA adapter into the base model and export it to ONNX
+
+    The export is written to a temporary sibling directory and moved into
+    place only once complete, so an interrupted export never leaves a
+    half-written output_dir behind. The merged fp32 checkpoint it goes
+    through is deleted afterwards.
+
+    Args:
+        adapter_path: Path to LoRA adapter directory
+        base_model: Base model name (e.g. t5-base)
+        output_dir: Directory receiving the exported ONNX model
+    """
+    import torch
+    from transformers import T5ForConditionalGeneration
+    from peft import PeftModel
+    from .t5_generator import MODEL_CACHE_DIR
+
+    logger.info(f"Exporting {base_model} + {adapter_path} to ONNX ({output_dir})...")
+
+    base = T5ForConditionalGeneration.from_pretrained(
+        base_model,
+        torch_dtype=torch.float32,
+        cache_dir=MODEL_CACHE_DIR,
+        use_safetensors=True
+    )
+    merged = PeftModel.from_pretrained(base, adapter_path).merge_and_unload()
+
+    parent = os.path.dirname(os.path.abspath(output_dir))
+    merged_dir = tempfile.mkdtemp(prefix=".merged-", dir=parent)
+    export_dir = tempfile.mkdtemp(prefix=".onnx-", dir=parent)
+    try:
+        merged.save_pretrained(merged_dir, safe_serialization=True)
+        ort_model = ORTModelForSeq2SeqLM.from_pretrained(merged_dir, export=True, use_cache=True)
+        ort_model.save_pretrained(export_dir)
+
+        # Leftover of an interrupted export made before exports were atomic
+        if os.path.isdir(output_dir) and not _is_exported(output_dir):
+            shutil.rmtree(output_dir)
+        try:
+            os.replace(export_dir, output_dir)
+        except OSError:
+            # Another process finished the same export first
+            if not _is_exported(output_dir):
+                raise
+    finally:
+        shutil.rmtree(merged_dir, ignore_errors=True)
+        shutil.rmtree(export_dir, ignore_errors=True)
+
+
+def load_onnx_model(adapter_path: str, base_model: str = "t5-base") -> "ORTModelForSeq2SeqLM":
+    """
+    Load the ONNX export of base model + adapter, exporting it on first use
+
+    Args:
+        adapter_path: Path to LoRA adapter directory
+        base_model: Base model name (default: t5-base)
+
+    Returns:
+        ORTModelForSeq2SeqLM running on the CPU execution provider
+    """
+    if not ONNX_AVAILABLE:
+        raise ImportError(
+            "ONNX backend requires optimum[onnxruntime]: pip install 'optimum[onnxruntime]'"
+        )
+
+    onnx_dir = os.path.join(adapter_path, ONNX_SUBDIR)
+    if not _is_exported(onnx_dir):
+        export_onnx_model(adapter_path, base_model, onnx_dir)
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        onnx_dir,
+        provider="CPUExecutionProvider",
+        session_options=_session_options(),
+        use_cache=True,
+        use_io_binding=True
+    )
+
+    logger.info(f"✅ ONNX hard generator loaded from {onnx_dir}")
+    return model
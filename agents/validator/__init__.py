@@ -4,11 +4,15 @@ Command validation, conflict detection, safety checks, and self-correction
 """
 
 from .validator import CommandValidator, ValidationPipeline
-from .syntax_checker import validate_syntax, quick_syntax_check
-from .conflict_checker import validate_conflicts, extract_flags, check_requires_root
+from .syntax_checker import validate_syntax, quick_syntax_check, validate_syntax_batch
+from .conflict_checker import (
+    validate_conflicts, extract_flags, check_requires_root, ConflictChecker,
+    validate_conflicts_batch
+)
 from .safety_checker import validate_safety, check_safe_execution, get_safety_warnings
-from .self_correct import SelfCorrector, correct_command
-from .decision import make_decision, calculate_confidence
+from .self_correct import SelfCorrector, correct_command, Attempt
+from .decision import make_decision, calculate_confidence, Decision
+from .analyzer import analyze_command, CommandAnalysis
 
 __all__ = [
     # Main classes
@@ -19,11 +23,14 @@ __all__ = [
     # Syntax validation
     'validate_syntax',
     'quick_syntax_check',
+    'validate_syntax_batch',
     
     # Conflict detection
     'validate_conflicts',
     'extract_flags',
     'check_requires_root',
+    'ConflictChecker',
+    'validate_conflicts_batch',
     
     # Safety checks
     'validate_safety',
@@ -32,10 +39,16 @@ __all__ = [
     
     # Self-correction
     'correct_command',
+    'Attempt',
     
     # Decision making
     'make_decision',
     'calculate_confidence',
+    'Decision',
+    
+    # Single-pass analysis
+    'analyze_command',
+    'CommandAnalysis',
 ]
 
 __version__ = '1.0.0'
@@ -0,0 +1,63 @@
+"""
+Command Analyzer - Person 4
+Runs every text-only check on a command in one place
+
+Syntax, conflict, root and safety checks each used to re-tokenize and
+rescan the command. analyze_command does that work once and memoizes the
+result, which also helps when self-correction re-validates the same command.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+try:
+    from .conflict_checker import extract_flags, _find_hardcoded_conflict, _ROOT_REQUIRED_SET
+    from .safety_checker import check_safe_execution
+    from .syntax_checker import _validate_syntax_tokens
+except ImportError:
+    # Fallback for running as script
+    from conflict_checker import extract_flags, _find_hardcoded_conflict, _ROOT_REQUIRED_SET  # type: ignore
+    from safety_checker import check_safe_execution  # type: ignore
+    from syntax_checker import _validate_syntax_tokens  # type: ignore
+
+
+class CommandAnalysis(NamedTuple):
+    """Result of a single analysis pass over a command"""
+    flags: Tuple[str, ...]
+    conflict: Optional[str]  # First conflict from the hardcoded rules, if any
+    root_flags: Tuple[str, ...]
+    safe: bool
+    safety_errors: Tuple[str, ...]
+    safety_warnings: Tuple[str, ...]
+    tokens: Tuple[str, ...]  # Whitespace-separated words of the command
+    syntax_valid: bool
+    syntax_message: str
+
+
+@lru_cache(maxsize=1024)
+def analyze_command(command: str) -> CommandAnalysis:
+    """
+    Extract flags once and run the conflict, root and safety checks on them
+
+    Args:
+        command: Nmap command to analyze
+
+    Returns:
+        CommandAnalysis (cached per command string)
+    """
+    flags = tuple(extract_flags(command))
+    tokens = tuple(command.split())
+    syntax_valid, syntax_message = _validate_syntax_tokens(tokens)
+    is_safe, errors, warnings = check_safe_execution(command)
+
+    return CommandAnalysis(
+        flags=flags,
+        conflict=_find_hardcoded_conflict(flags),
+        root_flags=tuple(f for f in flags if f in _ROOT_REQUIRED_SET),
+        safe=is_safe,
+        safety_errors=tuple(errors),
+        safety_warnings=tuple(warnings),
+        tokens=tokens,
+        syntax_valid=syntax_valid,
+        syntax_message=syntax_message
+    )
@@ -6,7 +6,15 @@ INTEGRATED VERSION: Uses Person 1's Knowledge Graph
 """
 
 import re
-from typing import Tuple, List, Optional
+import sys
+import logging
+import weakref
+from typing import TYPE_CHECKING, Dict, FrozenSet, Tuple, List, Optional, Iterable, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
 
 # ============================================================================
 # IMPORT PERSON 1's KNOWLEDGE GRAPH
@@ -15,52 +23,90 @@ from typing import Tuple, List, Optional
 try:
     from agents.comprehension.kg_utils import get_kg_client
     KG_AVAILABLE = True
-    print("✅ Knowledge Graph integrated successfully!")
+    logger.debug("Knowledge Graph integrated successfully")
 except ImportError:
     KG_AVAILABLE = False
-    print("⚠️  Knowledge Graph not available, using fallback rules")
+    logger.debug("Knowledge Graph not available, using fallback rules")
 
 # ============================================================================
 # HARDCODED CONFLICT RULES (FALLBACK WITHOUT KG)
 # ============================================================================
 
+# Scan types are mutually exclusive: any two distinct members conflict
+_SCAN_TYPES = ('-sS', '-sT', '-sU', '-sN', '-sF', '-sX', '-sA', '-sW', '-sM')
+_SCAN_TYPE_GROUP = frozenset(_SCAN_TYPES)
+
 HARDCODED_CONFLICTS = {
-    'scan_types': {
-        '-sS': ['-sT', '-sA', '-sW', '-sM', '-sU', '-sN', '-sF', '-sX'],
-        '-sT': ['-sS', '-sA', '-sW', '-sM', '-sU', '-sN', '-sF', '-sX'],
-        '-sU': ['-sS', '-sT', '-sA', '-sW', '-sM', '-sN', '-sF', '-sX'],
-        '-sN': ['-sS', '-sT', '-sA', '-sW', '-sM', '-sU', '-sF', '-sX'],
-        '-sF': ['-sS', '-sT', '-sA', '-sW', '-sM', '-sU', '-sN', '-sX'],
-        '-sX': ['-sS', '-sT', '-sA', '-sW', '-sM', '-sU', '-sN', '-sF'],
-        '-sA': ['-sS', '-sT', '-sW', '-sM', '-sU', '-sN', '-sF', '-sX'],
-        '-sW': ['-sS', '-sT', '-sA', '-sM', '-sU', '-sN', '-sF', '-sX'],
-        '-sM': ['-sS', '-sT', '-sA', '-sW', '-sU', '-sN', '-sF', '-sX'],
-    },
+    # Derived from the group: each scan type conflicts with all the others
+    'scan_types': {flag: _SCAN_TYPE_GROUP - {flag} for flag in _SCAN_TYPES},
     'special': {
-        '-sn': ['-p'],
-        '-Pn': ['-PS', '-PA', '-PU', '-PE', '-PP', '-PM'],
+        '-sn': frozenset({'-p'}),
+        '-Pn': frozenset({'-PS', '-PA', '-PU', '-PE', '-PP', '-PM'}),
     }
 }
 
+_SPECIAL_KEYS = frozenset(HARDCODED_CONFLICTS['special'])
+
+# -Pn conflicts with any ping probe flag
+_PING_PROBES = HARDCODED_CONFLICTS['special']['-Pn']
+_OTHER_SPECIAL_KEYS = _SPECIAL_KEYS - {'-Pn'}
+
+# Flat flag -> conflicting flags index built once from both rule sections
+FLAG_CONFLICTS: Dict[str, FrozenSet[str]] = {}
+for _section in (HARDCODED_CONFLICTS['scan_types'], HARDCODED_CONFLICTS['special']):
+    for _flag, _conflicting in _section.items():
+        FLAG_CONFLICTS[_flag] = FLAG_CONFLICTS.get(_flag, frozenset()) | _conflicting
+
+# One bit per rule flag for batch validation (fits in uint32)
+_BATCH_BIT: Dict[str, int] = {}
+for _flag in (*_SCAN_TYPES, *sorted(_SPECIAL_KEYS),
+              *sorted(set().union(*HARDCODED_CONFLICTS['special'].values()))):
+    _BATCH_BIT.setdefault(_flag, 1 << len(_BATCH_BIT))
+_BATCH_SCAN_MASK = sum(_BATCH_BIT[f] for f in _SCAN_TYPES)
+_BATCH_SPECIAL_RULES = tuple(
+    (_BATCH_BIT[_flag], sum(_BATCH_BIT[c] for c in _conflicting))
+    for _flag, _conflicting in HARDCODED_CONFLICTS['special'].items()
+)
+
 ROOT_REQUIRED_FLAGS = [
     '-sS', '-sU', '-sN', '-sF', '-sX', '-sA', '-sW', '-sM',
     '-O', '--traceroute',
 ]
+_ROOT_REQUIRED_SET = frozenset(ROOT_REQUIRED_FLAGS)
+
+# Finds ROOT_REQUIRED_FLAGS straight in the command text (no flag extraction)
+_ROOT_FLAG_RE = re.compile(r'(?<![\w-])(?:-s[SUNFXAWM]|-O)(?![a-zA-Z0-9])|(?<![\w-])--traceroute(?![\w-])')
 
 # ============================================================================
 # FLAG EXTRACTION
 # ============================================================================
 
+_FLAG_RE = re.compile(r'-[a-zA-Z0-9]+|--[\w-]+')
+
+# Canonical (interned) instances of every flag the rules know about, so
+# extracted tokens reuse one object with a cached hash in set/dict lookups
+_CANON = {
+    sys.intern(f): sys.intern(f)
+    for f in (*ROOT_REQUIRED_FLAGS, *_SCAN_TYPES, *_SPECIAL_KEYS,
+              *(c for group in HARDCODED_CONFLICTS['special'].values() for c in group))
+}
+
+
 def extract_flags(command: str) -> List[str]:
     """Extract nmap flags from command"""
-    flags = re.findall(r'-[a-zA-Z0-9]+|--[\w-]+', command)
-    return flags
+    canon = _CANON.get
+    return [canon(t, t) for t in _FLAG_RE.findall(command)]
 
 # ============================================================================
 # CONFLICT DETECTION (INTEGRATED WITH KG)
 # ============================================================================
 
-def validate_conflicts(command: str, kg_client=None) -> Tuple[bool, str]:
+# Default kg_client of the module-level checks: auto-detect the KG. An
+# explicit kg_client=None selects the hardcoded rules instead.
+_AUTO_DETECT = object()
+
+def validate_conflicts(command: str, kg_client=_AUTO_DETECT,
+                       flags: Optional[Iterable[str]] = None) -> Tuple[bool, str]:
     """
     Validate that command has no conflicting flags
     
@@ -68,40 +114,176 @@ def validate_conflicts(command: str, kg_client=None) -> Tuple[bool, str]:
     
     Args:
         command: Nmap command to validate
-        kg_client: Knowledge Graph client (optional, auto-detected)
+        kg_client: Knowledge Graph client (auto-detected when omitted;
+            None uses the hardcoded rules)
+        flags: Flags already extracted by the caller (e.g. the tuple returned by
+            HardGenerator.generate_with_flags); skips re-parsing the command
         
     Returns:
         (is_valid, message) tuple
     """
-    flags = extract_flags(command)
+    flags = extract_flags(command) if flags is None else list(flags)
+    if not flags:
+        return (True, "No flags to validate")
+    
+    return _checker_for(kg_client).validate(command, flags)
+
+
+def _find_hardcoded_conflict(flags: Sequence[str]) -> Optional[str]:
+    """
+    Return the first conflict message from the hardcoded rules, or None
+    
+    Reported pairs follow command order so messages are deterministic.
+    """
+    flag_set = set(flags)
+    scan_hits = flag_set & _SCAN_TYPE_GROUP
+    special_hits = flag_set & _SPECIAL_KEYS
+    
+    # Fast path for nearly every real command: at most one scan type and
+    # no flag with a special rule
+    if len(scan_hits) < 2 and not special_hits:
+        return None
+    
+    # Check scan type conflicts: more than one distinct scan type
+    if len(scan_hits) > 1:
+        first = next(f for f in flags if f in scan_hits)
+        second = next(f for f in flags if f in scan_hits and f != first)
+        return f"Conflict detected: {first} conflicts with {second} (cannot use multiple scan types)"
+    
+    if not special_hits:
+        return None
+    
+    # Check special conflicts: -Pn with a ping probe
+    if '-Pn' in special_hits:
+        probes = flag_set & _PING_PROBES
+        if probes:
+            probe = next(f for f in flags if f in probes)
+            return f"Conflict detected: -Pn conflicts with {probe}"
+    
+    # Remaining special rules
+    for flag in flags:
+        if flag in special_hits and flag in _OTHER_SPECIAL_KEYS:
+            hit = HARDCODED_CONFLICTS['special'][flag] & flag_set
+            if hit:
+                conflict_flag = next(f for f in flags if f in hit)
+                return f"Conflict detected: {flag} conflicts with {conflict_flag}"
     
-    # Auto-detect KG if not provided
-    # if kg_client is None and KG_AVAILABLE:
-    #     kg_client = get_kg_client()
+    return None
+
+
+def validate_conflicts_batch(commands: List[str]) -> "np.ndarray":
+    """
+    Validate many commands at once against the hardcoded rules
     
+    Each command is encoded as a bitmask of the rule flags it contains and
+    the conflict rules are evaluated on the whole array. Only the verdict is
+    computed; use validate_conflicts() for the message of a given command.
     
-    # Only auto-detect if kg_client not explicitly set to None in function call
-    # If called with kg_client=None, respect that and use fallback
-    if kg_client is None and KG_AVAILABLE:
-    # Check if we're in test mode (caller explicitly passed None)
-        import inspect
-        frame = inspect.currentframe()
-        caller_frame = frame.f_back
-        caller_args = inspect.getargvalues(caller_frame)
-    
-    # If 'kg_client' was explicitly passed as None, don't auto-detect
-        if 'kg_client' not in caller_args.locals:
+    Args:
+        commands: Nmap commands to validate
+        
+    Returns:
+        Boolean array, True where the command has no conflicting flags
+        (same as the first element returned by validate_conflicts)
+    """
+    import numpy as np
+    
+    bit = _BATCH_BIT.get
+    masks = np.fromiter(
+        (sum({bit(f, 0) for f in _FLAG_RE.findall(command)}) for command in commands),
+        dtype=np.uint32,
+        count=len(commands)
+    )
+    
+    # More than one scan type: clearing the lowest set bit leaves bits behind
+    scan = masks & np.uint32(_BATCH_SCAN_MASK)
+    conflict = (scan & (scan - np.uint32(1))) != 0
+    
+    for key_bit, conflicting_bits in _BATCH_SPECIAL_RULES:
+        conflict |= ((masks & np.uint32(key_bit)) != 0) & ((masks & np.uint32(conflicting_bits)) != 0)
+    
+    return ~conflict
+
+# ============================================================================
+# ROOT REQUIREMENT CHECK (INTEGRATED WITH KG)
+# ============================================================================
+
+def check_requires_root(command: str, kg_client=_AUTO_DETECT,
+                        flags: Optional[Iterable[str]] = None) -> Tuple[bool, List[str]]:
+    """
+    Check if command requires root/sudo privileges
+    
+    INTEGRATED: Now uses Person 1's Knowledge Graph!
+    kg_client works as in validate_conflicts(). Pass ``flags`` when they are
+    already known to skip re-parsing the command.
+    """
+    return _checker_for(kg_client).requires_root(command, flags)
+
+
+# ============================================================================
+# CONFLICT CHECKER (KG OR FALLBACK STRATEGY CHOSEN ONCE)
+# ============================================================================
+
+class ConflictChecker:
+    """
+    Conflict and root checks bound to one strategy when created
+    
+    The Knowledge Graph is probed once in __init__. Every later call goes
+    straight to the KG-backed or the hardcoded implementation instead of
+    re-deciding per command.
+    
+    Usage:
+        checker = ConflictChecker(kg_client)
+        valid, msg = checker.validate("nmap -sS -sT 192.168.1.1")
+        requires_root, root_flags = checker.requires_root("nmap -sU 10.0.0.1")
+    """
+    
+    def __init__(self, kg_client=None, auto_detect: bool = False, probe: bool = True):
+        """
+        Initialize checker
+        
+        Args:
+            kg_client: Knowledge Graph client (None uses the hardcoded rules)
+            auto_detect: Create a KG client when none is given and the KG is available
+            probe: Make sure the client answers a query before relying on it
+        """
+        if kg_client is None and auto_detect and KG_AVAILABLE:
             try:
                 kg_client = get_kg_client()
             except Exception:
                 kg_client = None
-
-                
-    # Try to use Knowledge Graph
-    if kg_client is not None:
+        
+        if kg_client is not None and probe and not _probe_kg(kg_client):
+            kg_client = None
+        
+        self.kg_client = kg_client
+        if kg_client is not None:
+            self._find_conflict = self._kg_conflict
+            self._get_root_flags = self._kg_root_flags
+        else:
+            self._find_conflict = _hardcoded_conflict
+            self._get_root_flags = _hardcoded_root_flags
+    
+    def validate(self, command: str,
+                 flags: Optional[Iterable[str]] = None) -> Tuple[bool, str]:
+        """Same contract as validate_conflicts()"""
+        flags = extract_flags(command) if flags is None else list(flags)
+        if not flags:
+            return (True, "No flags to validate")
+        return self._find_conflict(flags)
+    
+    def requires_root(self, command: str,
+                      flags: Optional[Iterable[str]] = None) -> Tuple[bool, List[str]]:
+        """Same contract as check_requires_root()"""
+        root_flags_found = self._get_root_flags(command, flags)
+        return (len(root_flags_found) > 0, root_flags_found)
+    
+    def _kg_conflict(self, flags: List[str]) -> Tuple[bool, str]:
+        """Conflict check via the Knowledge Graph, hardcoded rules on failure"""
         try:
-            print("🔍 Using Knowledge Graph for conflict detection...")
-            conflicts_dict = kg_client.validate_command_conflicts(flags)
+            logger.debug("Using Knowledge Graph for conflict detection")
+            # Only the first conflict is reported, stop querying once found
+            conflicts_dict = self.kg_client.validate_command_conflicts(flags, stop_at_first=True)
             
             if conflicts_dict:
                 # Found conflicts via KG
@@ -114,72 +296,97 @@ def validate_conflicts(command: str, kg_client=None) -> Tuple[bool, str]:
                 if len(conflicts_list) > 1:
                     message += f" (and {len(conflicts_list)-1} more)"
                 
-                print(f"❌ Conflicts found via KG: {conflicts_list}")
+                logger.debug("Conflicts found via KG: %s", conflicts_list)
                 return (False, message)
             else:
-                print("✅ No conflicts found via KG")
+                logger.debug("No conflicts found via KG")
                 return (True, "No conflicts detected (verified with Knowledge Graph)")
         
         except Exception as e:
-            print(f"⚠️  KG query failed: {e}, falling back to hardcoded rules")
-            # Fall through to fallback
-    
-    # FALLBACK: Use hardcoded conflict rules
-    print("🔄 Using fallback conflict rules...")
-    
-    # Check scan type conflicts
-    for flag in flags:
-        if flag in HARDCODED_CONFLICTS['scan_types']:
-            conflicting = HARDCODED_CONFLICTS['scan_types'][flag]
-            for conflict_flag in conflicting:
-                if conflict_flag in flags:
-                    return (False, f"Conflict detected: {flag} conflicts with {conflict_flag} (cannot use multiple scan types)")
-    
-    # Check special conflicts
-    for flag in flags:
-        if flag in HARDCODED_CONFLICTS['special']:
-            conflicting = HARDCODED_CONFLICTS['special'][flag]
-            for conflict_flag in conflicting:
-                if conflict_flag in flags:
-                    return (False, f"Conflict detected: {flag} conflicts with {conflict_flag}")
-    
-    return (True, "No conflicts detected (using fallback rules)")
-
-# ============================================================================
-# ROOT REQUIREMENT CHECK (INTEGRATED WITH KG)
-# ============================================================================
-
-def check_requires_root(command: str, kg_client=None) -> Tuple[bool, List[str]]:
-    """
-    Check if command requires root/sudo privileges
-    
-    INTEGRATED: Now uses Person 1's Knowledge Graph!
-    """
-    flags = extract_flags(command)
-    
-    # Auto-detect KG
-    if kg_client is None and KG_AVAILABLE:
-        kg_client = get_kg_client()
+            logger.debug("KG query failed: %s, falling back to hardcoded rules", e)
+            return _hardcoded_conflict(flags)
     
-    # Try KG first
-    if kg_client is not None:
+    def _kg_root_flags(self, command: str, flags: Optional[Iterable[str]]) -> List[str]:
+        """Root flags via the Knowledge Graph, hardcoded list on failure"""
+        flags = extract_flags(command) if flags is None else list(flags)
         try:
-            options = kg_client.get_options(requires_root=True)
-            root_flags_from_kg = [opt.name for opt in options]
+            options = self.kg_client.get_options(requires_root=True)
+            root_flags_from_kg = {opt.name for opt in options}
             
             root_flags_found = [f for f in flags if f in root_flags_from_kg]
             
             if root_flags_found:
-                print(f"✅ Root flags detected via KG: {root_flags_found}")
+                logger.debug("Root flags detected via KG: %s", root_flags_found)
             
-            return (len(root_flags_found) > 0, root_flags_found)
+            return root_flags_found
         
         except Exception as e:
-            print(f"⚠️  KG root check failed: {e}, using fallback")
+            logger.debug("KG root check failed: %s, using fallback", e)
+            return _hardcoded_root_flags(command, flags)
+
+
+def _probe_kg(kg_client) -> bool:
+    """Return True if the KG client answers a simple conflict query"""
+    try:
+        kg_client.get_conflicts('-sS')
+        return True
+    except Exception as e:
+        logger.debug("KG probe failed: %s, using hardcoded rules", e)
+        return False
+
+
+def _hardcoded_conflict(flags: List[str]) -> Tuple[bool, str]:
+    """validate_conflicts result from the hardcoded rules"""
+    message = _find_hardcoded_conflict(flags)
+    if message:
+        return (False, message)
     
-    # Fallback
-    root_flags_found = [f for f in flags if f in ROOT_REQUIRED_FLAGS]
-    return (len(root_flags_found) > 0, root_flags_found)
+    return (True, "No conflicts detected (using fallback rules)")
+
+
+def _hardcoded_root_flags(command: str, flags: Optional[Iterable[str]]) -> List[str]:
+    """Root-requiring flags from the hardcoded list, in command order"""
+    if flags is None:
+        # One regex pass over the text instead of extracting every flag
+        return _ROOT_FLAG_RE.findall(command)
+    return [f for f in flags if f in _ROOT_REQUIRED_SET]
+
+
+# Shared checker for callers without a KG client
+_FALLBACK_CHECKER = ConflictChecker()
+
+# Checkers of the module-level checks, one per KG client and dropped with it
+_CHECKERS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+# KG client found by the first auto-detecting call
+_auto_kg = None
+
+
+def _auto_kg_client():
+    """KG client shared by every auto-detecting call (None without the KG)"""
+    global _auto_kg
+    if _auto_kg is None and KG_AVAILABLE:
+        try:
+            _auto_kg = get_kg_client()
+        except Exception:
+            return None
+    return _auto_kg
+
+
+def _checker_for(kg_client) -> ConflictChecker:
+    """Checker bound to kg_client, reused across calls"""
+    if kg_client is _AUTO_DETECT:
+        kg_client = _auto_kg_client()
+    if kg_client is None:
+        return _FALLBACK_CHECKER
+    try:
+        checker = _CHECKERS.get(kg_client)
+        if checker is None:
+            checker = _CHECKERS[kg_client] = ConflictChecker(kg_client, probe=False)
+    except TypeError:
+        # Client not weak-referenceable or hashable: nothing to key on
+        checker = ConflictChecker(kg_client, probe=False)
+    return checker
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -199,13 +406,7 @@ def get_all_conflicts(flag: str, kg_client=None) -> List[str]:
             pass
     
     # Fallback
-    all_conflicts = []
-    if flag in HARDCODED_CONFLICTS['scan_types']:
-        all_conflicts.extend(HARDCODED_CONFLICTS['scan_types'][flag])
-    if flag in HARDCODED_CONFLICTS['special']:
-        all_conflicts.extend(HARDCODED_CONFLICTS['special'][flag])
-    
-    return all_conflicts
+    return sorted(FLAG_CONFLICTS.get(flag, ()))
 
 
 
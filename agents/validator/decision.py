@@ -9,14 +9,105 @@ This is the last step in the pipeline:
 4. Now we calculate confidence and provide explanation
 """
 
-from typing import Dict, List, Optional
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Decision:
+    """
+    Final decision returned by make_decision
+    
+    Readable like the former result dict (decision['confidence'],
+    decision.get('metadata'), dict(decision)) with keys command, confidence,
+    explanation, validation, metadata and, when set, correction_history.
+    The metadata dict is only built when accessed.
+    """
+    command: str
+    confidence: float
+    explanation: str
+    validation: Dict
+    complexity: str = 'MEDIUM'
+    attempts: int = 1
+    corrected: bool = False
+    correction_history: Optional[List[Any]] = None  # self_correct.Attempt tuples
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Generation and validation summary (built on access)"""
+        return {
+            "complexity": self.complexity,
+            "attempts": self.attempts,
+            "corrected": self.corrected,
+            "validation_score": self.validation.get('score', 0.0),
+            "has_errors": len(self.validation.get('errors', [])) > 0,
+            "has_warnings": len(self.validation.get('warnings', [])) > 0
+        }
+    
+    def keys(self) -> Tuple[str, ...]:
+        if self.correction_history is None:
+            return _DECISION_KEYS
+        return _DECISION_KEYS + ('correction_history',)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self.keys() else default
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self.keys()
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def __len__(self) -> int:
+        return len(self.keys())
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, getattr(self, key)) for key in self.keys()]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy (e.g. for JSON serialization)"""
+        out = dict(self.items())
+        if self.correction_history is not None:
+            out['correction_history'] = [
+                a._asdict() if hasattr(a, '_asdict') else a for a in self.correction_history
+            ]
+        return out
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Decision':
+        """Rebuild a Decision from to_dict() output (e.g. read back from JSON)"""
+        metadata = data.get('metadata') or {}
+        history = data.get('correction_history')
+        if history is not None:
+            from .self_correct import Attempt
+            history = [Attempt(**a) if isinstance(a, dict) else a for a in history]
+        return cls(
+            command=data['command'],
+            confidence=data['confidence'],
+            explanation=data['explanation'],
+            validation=data['validation'],
+            complexity=metadata.get('complexity', 'MEDIUM'),
+            attempts=metadata.get('attempts', 1),
+            corrected=metadata.get('corrected', False),
+            correction_history=history
+        )
+
+
+_DECISION_KEYS: Tuple[str, ...] = ('command', 'confidence', 'explanation', 'validation', 'metadata')
 
 
 def make_decision(
     command: str,
     validation: Dict,
     generation_info: Optional[Dict] = None
-) -> Dict[str, any]:
+) -> Decision:
     """
     Make final decision with confidence score and explanation
     
@@ -36,6 +127,7 @@ def make_decision(
             - corrected: whether command was corrected
             
     Returns:
+        Decision, readable like the dict
         {
             "command": str,
             "confidence": float (0-1),
@@ -80,23 +172,16 @@ def make_decision(
         corrected=corrected
     )
     
-    # Create metadata
-    metadata = {
-        "complexity": complexity,
-        "attempts": attempts,
-        "corrected": corrected,
-        "validation_score": score,
-        "has_errors": len(errors) > 0,
-        "has_warnings": len(warnings) > 0
-    }
-    
-    return {
-        "command": command,
-        "confidence": confidence,
-        "explanation": explanation,
-        "validation": validation,
-        "metadata": metadata
-    }
+    # Metadata is derived on access from these fields
+    return Decision(
+        command=command,
+        confidence=confidence,
+        explanation=explanation,
+        validation=validation,
+        complexity=complexity,
+        attempts=attempts,
+        corrected=corrected
+    )
 
 
 def calculate_confidence(
@@ -126,18 +211,49 @@ def calculate_confidence(
     Returns:
         Confidence score between 0 and 1
     """
+    # Only the thresholds matter, so reduce the inputs to a small discrete key
+    if not is_valid:
+        score_bucket = 0
+    elif score >= 0.9:
+        score_bucket = 3
+    elif score >= 0.7:
+        score_bucket = 2
+    else:
+        score_bucket = 1
+    
+    # The retry penalty stops growing at _MAX_PENALIZED_ATTEMPTS
+    attempts = min(attempts, _MAX_PENALIZED_ATTEMPTS)
+    
+    return _confidence_cached(score_bucket, attempts, bool(has_errors),
+                              bool(has_warnings), complexity)
+
+
+# Retry penalty is capped at 0.15, reached on the 4th attempt
+_MAX_PENALIZED_ATTEMPTS = 4
+
+# Confidence adjustment per validation score bucket (see calculate_confidence)
+_SCORE_BUCKET_BONUS = (
+    -0.2,   # Failed validation
+    0.05,   # Minimal validation
+    0.1,    # Good validation
+    0.2,    # Excellent validation
+)
+
+
+@lru_cache(maxsize=128)
+def _confidence_cached(
+    score_bucket: int,
+    attempts: int,
+    has_errors: bool,
+    has_warnings: bool,
+    complexity: str
+) -> float:
+    """calculate_confidence on bucketed inputs, memoized"""
     # Base confidence
     confidence = 0.7
     
     # Factor 1: Validation score (most important)
-    if is_valid and score >= 0.9:
-        confidence += 0.2  # Excellent validation
-    elif is_valid and score >= 0.7:
-        confidence += 0.1  # Good validation
-    elif is_valid:
-        confidence += 0.05  # Minimal validation
-    else:
-        confidence -= 0.2  # Failed validation
+    confidence += _SCORE_BUCKET_BONUS[score_bucket]
     
     # Factor 2: Errors
     if has_errors:
@@ -192,43 +308,46 @@ def generate_explanation(
     Returns:
         Explanation string
     """
-    parts = []
-    
     # Main status
-    if is_valid:
-        parts.append(f"✅ Valid {complexity} complexity command generated")
-    else:
-        parts.append(f"⚠️ Generated command has validation issues")
+    status = (f"✅ Valid {complexity} complexity command generated" if is_valid
+              else _STATUS_INVALID)
     
     # Correction status
-    if corrected and attempts > 1:
-        parts.append(f"Command was corrected after {attempts} attempts")
-    elif attempts > 1:
-        parts.append(f"Generated in {attempts} attempts")
-    
-    # Errors
-    if errors:
-        parts.append(f"Errors found: {', '.join(errors[:2])}")
-        if len(errors) > 2:
-            parts.append(f"... and {len(errors) - 2} more")
-    
-    # Warnings
-    if warnings:
-        parts.append(f"Warnings: {', '.join(warnings[:2])}")
-        if len(warnings) > 2:
-            parts.append(f"... and {len(warnings) - 2} more")
+    if attempts > 1:
+        retry = (f"Command was corrected after {attempts} attempts. " if corrected
+                 else f"Generated in {attempts} attempts. ")
+    else:
+        retry = ""
     
     # Score interpretation
-    if score >= 0.9:
-        parts.append("High confidence in command validity")
-    elif score >= 0.7:
-        parts.append("Moderate confidence in command validity")
-    elif score >= 0.5:
-        parts.append("Low confidence - review recommended")
+    for threshold, sentence in _SCORE_SENTENCES:
+        if score >= threshold:
+            break
     else:
-        parts.append("Very low confidence - manual review required")
+        sentence = _SCORE_SENTENCE_LOWEST
     
-    return ". ".join(parts) + "."
+    return (f"{status}. {retry}{_list_sentence('Errors found', errors)}"
+            f"{_list_sentence('Warnings', warnings)}{sentence}.")
+
+
+_STATUS_INVALID = "⚠️ Generated command has validation issues"
+
+# (minimum score, interpretation) from highest to lowest band
+_SCORE_SENTENCES = (
+    (0.9, "High confidence in command validity"),
+    (0.7, "Moderate confidence in command validity"),
+    (0.5, "Low confidence - review recommended"),
+)
+_SCORE_SENTENCE_LOWEST = "Very low confidence - manual review required"
+
+
+def _list_sentence(label: str, items: List[str]) -> str:
+    """'label: first, second. ... and N more. ' or '' for an empty list"""
+    if not items:
+        return ""
+    if len(items) > 2:
+        return f"{label}: {', '.join(items[:2])}. ... and {len(items) - 2} more. "
+    return f"{label}: {', '.join(items)}. "
 
 
 def get_recommendation(confidence: float) -> str:
@@ -251,8 +370,8 @@ def get_recommendation(confidence: float) -> str:
         return "Do not execute - regenerate or create manually"
 
 
-# Test
-if __name__ == "__main__":
+def _selftest():
+    """Print the manual checks (NMAPAI_RUN_SELFTEST=1 python decision.py)"""
     print("=" * 60)
     print("DECISION AGENT TESTS")
     print("=" * 60)
@@ -347,3 +466,7 @@ if __name__ == "__main__":
     print("\n" + "=" * 60)
     print("DECISION AGENT TESTS COMPLETE")
     print("=" * 60)
+
+
+if __name__ == "__main__" and os.environ.get("NMAPAI_RUN_SELFTEST"):
+    _selftest()
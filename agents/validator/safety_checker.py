@@ -9,6 +9,7 @@ Prevents:
 - System modifications (rm, chmod, sudo in command)
 """
 
+import os
 import re
 from typing import List, Tuple
 
@@ -39,6 +40,12 @@ BLACKLIST_PATTERNS = [
     # These are checked separately with warnings
 ]
 
+# All blacklist patterns matched in a single left-to-right pass; longer
+# patterns first so '>>' and '||' are seen whole
+_BLACKLIST_RE = re.compile(
+    '|'.join(re.escape(p) for p in sorted(BLACKLIST_PATTERNS, key=len, reverse=True))
+)
+
 # Scripts that should generate warnings but not block
 WARNING_SCRIPTS = [
     'exploit',  # Exploitation scripts
@@ -52,6 +59,49 @@ FORBIDDEN_SCRIPTS = [
     'malware',  # Malware scripts are too dangerous
 ]
 
+# sanitize_command patterns
+_REDIR_RE = re.compile(r'\s*[>|<]+\s*\S*')
+_CHAIN_RE = re.compile(r'\s*[;&|]+\s*')
+_SUBST_RE = re.compile(r'\$\([^)]*\)|`[^`]*`')
+
+# Every warning trigger matched in one pass; group name -> warning message.
+# All triggers start with '-', factored out so positions without a dash
+# are rejected with a single character test instead of one per branch.
+_WARN_RE = re.compile(
+    r'-(?:'
+    r'(?P<T45>T[45])'
+    r'|(?P<A>A\b)'
+    r'|(?P<pall>p-|p\s+1-65535)'
+    r'|(?P<sU>sU)'
+    r'|(?P<sV>sV)'
+    r'|(?P<O>O\b)'
+    r'|(?P<script>(?i:-script))'
+    r')'
+)
+_WARN_MESSAGES = (
+    ('T45', "Aggressive timing (-T4/-T5) may be detected"),
+    ('A', "Aggressive scan (-A) enables OS detection and scripts"),
+    ('pall', "Full port scan will take significant time"),
+    ('sU', "UDP scan requires root and is slower"),
+    ('sV', "Version detection increases scan time"),
+    ('O', "OS detection requires root privileges"),
+)
+
+# Case-insensitive script checks on the raw command (no lowercased copy).
+# Script names are found with a lookahead so overlapping names are all
+# reported, exactly like substring tests.
+_SCRIPT_FLAG_RE = re.compile(r'--script', re.IGNORECASE)
+_WARNING_SCRIPTS_LOWER = tuple(s.lower() for s in WARNING_SCRIPTS)
+_WARNING_SCRIPT_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(s) for s in (*_WARNING_SCRIPTS_LOWER, 'vuln')) + '))',
+    re.IGNORECASE
+)
+_FORBIDDEN_SCRIPTS_LOWER = tuple(s.lower() for s in FORBIDDEN_SCRIPTS)
+_FORBIDDEN_SCRIPT_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(s) for s in _FORBIDDEN_SCRIPTS_LOWER) + '))',
+    re.IGNORECASE
+)
+
 
 def validate_safety(command: str) -> bool:
     """
@@ -69,20 +119,33 @@ def validate_safety(command: str) -> bool:
     Returns:
         True if safe, False if dangerous
     """
-    command_lower = command.lower()
-    
     # Check blacklist patterns
-    for pattern in BLACKLIST_PATTERNS:
-        if pattern in command:
-            return False
+    if _BLACKLIST_RE.search(command):
+        return False
     
     # Check for forbidden scripts
-    if '--script' in command_lower:
-        for forbidden in FORBIDDEN_SCRIPTS:
-            if forbidden in command_lower:
-                return False
+    return not (_SCRIPT_FLAG_RE.search(command) and _FORBIDDEN_SCRIPT_RE.search(command))
+
+
+def _forbidden_scripts(command: str) -> List[str]:
+    """Forbidden script names present in command, in FORBIDDEN_SCRIPTS order"""
+    if not _SCRIPT_FLAG_RE.search(command):
+        return []
+    found = {s.lower() for s in _FORBIDDEN_SCRIPT_RE.findall(command)}
+    return [s for s in _FORBIDDEN_SCRIPTS_LOWER if s in found]
+
+
+def _blacklist_hits(command: str) -> List[str]:
+    """
+    Return every blacklist pattern found in command, in BLACKLIST_PATTERNS order
     
-    return True
+    One regex pass collects the matches; patterns contained in a longer
+    match (e.g. '>' inside '>>') are reported too, as with substring checks.
+    """
+    matches = set(_BLACKLIST_RE.findall(command))
+    if not matches:
+        return []
+    return [p for p in BLACKLIST_PATTERNS if any(p in m for m in matches)]
 
 
 def get_safety_warnings(command: str) -> List[str]:
@@ -100,41 +163,26 @@ def get_safety_warnings(command: str) -> List[str]:
     Returns:
         List of warning messages
     """
-    warnings = []
-    command_lower = command.lower()
+    warnings: List[str] = []
+    fired = {m.lastgroup for m in _WARN_RE.finditer(command)}
+    if not fired:
+        return warnings
     
     # Check for warning-level scripts
-    if '--script' in command_lower:
-        for script in WARNING_SCRIPTS:
-            if script in command_lower:
+    scripts = set()
+    if 'script' in fired:
+        scripts = {s.lower() for s in _WARNING_SCRIPT_RE.findall(command)}
+        for script in _WARNING_SCRIPTS_LOWER:
+            if script in scripts:
                 warnings.append(f"Script category '{script}' may be aggressive")
     
-    # Check for aggressive timing
-    if '-T4' in command or '-T5' in command:
-        warnings.append("Aggressive timing (-T4/-T5) may be detected")
-    
-    # Check for aggressive scan type
-    if '-A' in command:
-        warnings.append("Aggressive scan (-A) enables OS detection and scripts")
-    
-    # Check for full port scan
-    if '-p-' in command or '-p 1-65535' in command:
-        warnings.append("Full port scan will take significant time")
-    
-    # Check for UDP scan
-    if '-sU' in command:
-        warnings.append("UDP scan requires root and is slower")
-    
-    # Check for version detection
-    if '-sV' in command:
-        warnings.append("Version detection increases scan time")
-    
-    # Check for OS detection
-    if '-O' in command:
-        warnings.append("OS detection requires root privileges")
+    # Aggressive timing, -A, full port range, -sU, -sV, -O
+    for group, message in _WARN_MESSAGES:
+        if group in fired:
+            warnings.append(message)
     
     # Check for script scan
-    if '--script' in command_lower and 'vuln' in command_lower:
+    if 'vuln' in scripts:
         warnings.append("Vulnerability scripts may trigger IDS/IPS")
     
     return warnings
@@ -150,22 +198,9 @@ def check_safe_execution(command: str) -> Tuple[bool, List[str], List[str]]:
     Returns:
         (is_safe, list_of_errors, list_of_warnings)
     """
-    errors = []
-    warnings = []
-    
-    # Check for blocking issues
-    if not validate_safety(command):
-        # Identify which patterns caused the block
-        command_lower = command.lower()
-        
-        for pattern in BLACKLIST_PATTERNS:
-            if pattern in command:
-                errors.append(f"Dangerous pattern detected: {pattern}")
-        
-        if '--script' in command_lower:
-            for forbidden in FORBIDDEN_SCRIPTS:
-                if forbidden in command_lower:
-                    errors.append(f"Forbidden script: {forbidden}")
+    # Check for blocking issues (single scan collects every pattern hit)
+    errors = [f"Dangerous pattern detected: {p}" for p in _blacklist_hits(command)]
+    errors.extend(f"Forbidden script: {s}" for s in _forbidden_scripts(command))
     
     # Get warnings
     warnings = get_safety_warnings(command)
@@ -189,20 +224,19 @@ def sanitize_command(command: str) -> str:
         Sanitized command (or original if cannot sanitize)
     """
     # Remove file redirections
-    command = re.sub(r'\s*[>|<]+\s*\S*', '', command)
+    command = _REDIR_RE.sub('', command)
     
     # Remove command chaining
-    command = re.sub(r'\s*[;&|]+\s*', ' ', command)
+    command = _CHAIN_RE.sub(' ', command)
     
     # Remove shell substitutions
-    command = re.sub(r'\$\([^)]*\)', '', command)
-    command = re.sub(r'`[^`]*`', '', command)
+    command = _SUBST_RE.sub('', command)
     
     return command.strip()
 
 
-# Test function
-if __name__ == "__main__":
+def _selftest():
+    """Print the manual checks (NMAPAI_RUN_SELFTEST=1 python safety_checker.py)"""
     print("=" * 60)
     print("SAFETY CHECKER TESTS")
     print("=" * 60)
@@ -256,3 +290,7 @@ if __name__ == "__main__":
         print(f"Sanitized: {sanitized}")
         print(f"Now safe:  {validate_safety(sanitized)}")
         print()
+
+
+if __name__ == "__main__" and os.environ.get("NMAPAI_RUN_SELFTEST"):
+    _selftest()
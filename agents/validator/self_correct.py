@@ -9,8 +9,51 @@ This module implements a retry mechanism that:
 4. Returns best result after max attempts
 """
 
-from typing import Callable, Dict, List, Optional
-import copy
+from functools import partial
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import re
+import time
+
+
+# Conflict messages name the two flags: "-sS conflicts with -sT"
+_CONFLICT_RE = re.compile(r'(-\S+)\s+conflicts with\s+(-\S+)')
+
+# _fix_safety patterns: redirections and command chains (a chain drops the
+# rest of the command) in one pass, then shell substitutions in a second one
+_UNSAFE_RE = re.compile(r'\s*[>|<]+\s*\S*|\s*[;&|]+.*$')
+_SUBST_RE = re.compile(r'\$\([^)]*\)|`[^`]*`')
+
+
+def _conflict_pairs(errors: Iterable[str]) -> List[Tuple[str, str]]:
+    """(flag1, flag2) from every "flag1 conflicts with flag2" error message"""
+    pairs = []
+    for error in errors:
+        match = _CONFLICT_RE.search(str(error))
+        if match:
+            pairs.append(match.groups())
+    return pairs
+
+
+class Attempt(NamedTuple):
+    """One entry of the correction history (use ._asdict() for a dict)"""
+    attempt: int
+    command: Optional[str]
+    validation: Dict
+    error: Optional[str] = None
+
+
+def _snapshot(validation: Dict) -> Dict:
+    """
+    Copy of a validation dict for the history
+    
+    Validation results hold plain values plus flat lists of messages, so a
+    shallow copy with fresh lists is enough (and much cheaper than deepcopy).
+    """
+    out = validation.copy()
+    for key in ('errors', 'warnings'):
+        if key in out:
+            out[key] = list(out[key])
+    return out
 
 
 class SelfCorrector:
@@ -23,6 +66,8 @@ class SelfCorrector:
     - Safety issues → Remove dangerous patterns
     """
     
+    __slots__ = ('max_retries',)
+    
     def __init__(self, max_retries: int = 3):
         """
         Initialize self-corrector
@@ -37,7 +82,8 @@ class SelfCorrector:
         intent: str,
         complexity: str,
         generator_func: Callable,
-        validator_func: Callable
+        validator_func: Callable,
+        time_budget_ms: Optional[float] = None
     ) -> Dict[str, any]:
         """
         Main self-correction loop
@@ -49,51 +95,58 @@ class SelfCorrector:
         4. Else: apply fix and retry
         5. After max retries: return best attempt
         
+        Retrying stops early when a (command, errors) pair comes back, when
+        the best score has not improved for two attempts, or when the time
+        budget is spent.
+        
         Args:
             intent: User's natural language intent
             complexity: EASY | MEDIUM | HARD
             generator_func: Function(intent, complexity) -> command_string
             validator_func: Function(command) -> validation_dict
+            time_budget_ms: Stop retrying after this many milliseconds
+                (default: no limit)
             
         Returns:
             {
                 "command": best_command,
                 "attempts": number_of_attempts,
                 "validation": final_validation_result,
-                "history": list_of_all_attempts,
+                "history": list_of_all_attempts (Attempt tuples),
                 "corrected": boolean
             }
         """
         history = []
         best_result = None
         best_score = 0.0
+        pending_fix = None  # Fixed command to validate instead of regenerating
+        seen = set()  # (command, errors) fingerprints already validated
+        stalled = 0  # Attempts in a row that did not beat the best score
+        deadline = None if time_budget_ms is None else time.monotonic() + time_budget_ms / 1000
         
         for attempt in range(self.max_retries):
-            # Generate command
-            try:
-                command = generator_func(intent, complexity)
-            except Exception as e:
-                # Generator failed
-                history.append({
-                    "attempt": attempt + 1,
-                    "command": None,
-                    "error": str(e),
-                    "validation": {"valid": False, "score": 0.0}
-                })
-                continue
+            # Generate command (or take the fix from the previous attempt)
+            if pending_fix is not None:
+                command, pending_fix = pending_fix, None
+            else:
+                try:
+                    command = generator_func(intent, complexity)
+                except Exception as e:
+                    # Generator failed
+                    history.append(Attempt(
+                        attempt + 1, None, {"valid": False, "score": 0.0}, str(e)
+                    ))
+                    continue
             
             # Validate
             validation = validator_func(command)
             
             # Record attempt
-            history.append({
-                "attempt": attempt + 1,
-                "command": command,
-                "validation": copy.deepcopy(validation)
-            })
+            history.append(Attempt(attempt + 1, command, _snapshot(validation)))
             
             # Update best result
             current_score = validation.get('score', 0.0)
+            stalled = 0 if attempt == 0 or current_score > best_score else stalled + 1
             if current_score > best_score:
                 best_score = current_score
                 best_result = {
@@ -113,6 +166,14 @@ class SelfCorrector:
                     "corrected": attempt > 0
                 }
             
+            # Stop on a repeated outcome, a stalled score or an exhausted budget
+            fingerprint = (command.strip(), tuple(sorted(validation.get('errors', ()))))
+            if fingerprint in seen or stalled >= 2:
+                break
+            seen.add(fingerprint)
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            
             # Try to fix for next iteration
             if attempt < self.max_retries - 1:
                 # Apply fixes based on validation feedback
@@ -123,9 +184,9 @@ class SelfCorrector:
                     # Can't fix - break early
                     break
                 
-                # Update command for next iteration
-                # Note: For now we just apply fixes to the command directly
-                # In production, you might feed feedback to generator
+                # Validate the fixed command next instead of calling the
+                # generator again
+                pending_fix = fixed_command
         
         # Return best attempt
         if best_result:
@@ -139,9 +200,9 @@ class SelfCorrector:
         else:
             # All attempts failed - return last attempt
             return {
-                "command": history[-1]["command"] if history else "",
+                "command": history[-1].command if history else "",
                 "attempts": self.max_retries,
-                "validation": history[-1]["validation"] if history else {"valid": False, "score": 0.0},
+                "validation": history[-1].validation if history else {"valid": False, "score": 0.0},
                 "history": history,
                 "corrected": False
             }
@@ -155,6 +216,10 @@ class SelfCorrector:
         - Syntax errors: Remove malformed parts
         - Safety errors: Remove dangerous patterns
         
+        Validation results carrying ``error_codes`` (see
+        CommandValidator.full_validation) are dispatched on the codes and
+        the conflicting flag pairs directly; plain error strings are scanned.
+        
         Args:
             command: Command to fix
             validation: Validation result with errors
@@ -166,18 +231,45 @@ class SelfCorrector:
             return command
         
         errors = validation.get('errors', [])
-        feedback = validation.get('feedback', '').lower()
-        
-        # Strategy 1: Remove conflicting flags
-        if any('conflict' in str(e).lower() for e in errors):
-            command = self._fix_conflicts(command, errors)
-        
-        # Strategy 2: Fix syntax issues
-        if any('syntax' in str(e).lower() for e in errors):
-            command = self._fix_syntax(command, errors)
+        error_codes = validation.get('error_codes')
+        
+        if error_codes is not None:
+            codes = {e['code'] for e in error_codes}
+            fix_conflicts = 'CONFLICT' in codes
+            fix_syntax = 'SYNTAX' in codes
+            fix_safety = 'SAFETY' in codes
+            conflict_pairs = [e['flags'] for e in error_codes
+                              if e['code'] == 'CONFLICT' and e.get('flags')]
+        else:
+            # Lowercase all errors once for the strategy checks below
+            error_text = '\n'.join(str(e) for e in errors).lower()
+            fix_conflicts = 'conflict' in error_text
+            fix_syntax = 'syntax' in error_text
+            fix_safety = 'safety' in error_text or 'dangerous' in error_text
+            conflict_pairs = None
+        
+        # Token-level fixes share one split and one join
+        if fix_conflicts or fix_syntax:
+            split = tokens = command.split()
+            
+            # Strategy 1: Remove conflicting flags
+            if fix_conflicts:
+                if conflict_pairs is None:
+                    conflict_pairs = _conflict_pairs(errors)
+                tokens = self._fix_conflicts_tokens(tokens, conflict_pairs)
+            
+            # Strategy 2: Fix syntax issues
+            if fix_syntax:
+                tokens = self._fix_syntax_tokens(tokens)
+            
+            # The fixes return their input list when there is nothing to fix:
+            # then keep the original string rather than a whitespace-normalized
+            # copy the loop would take for a new command
+            if tokens is not split:
+                command = ' '.join(tokens)
         
         # Strategy 3: Remove unsafe patterns
-        if any('safety' in str(e).lower() or 'dangerous' in str(e).lower() for e in errors):
+        if fix_safety:
             command = self._fix_safety(command)
         
         return command
@@ -195,25 +287,32 @@ class SelfCorrector:
         Returns:
             Fixed command
         """
-        import re
-        
-        parts = command.split()
-        
-        # Extract conflicting flags from error messages
-        for error in errors:
-            # Pattern: "flag1 conflicts with flag2"
-            match = re.search(r'(-\S+)\s+conflicts with\s+(-\S+)', error)
-            if match:
-                flag1, flag2 = match.groups()
-                
-                # Remove second occurrence
-                if flag2 in parts:
-                    parts.remove(flag2)
-                elif flag1 in parts and flag1 != flag2:
-                    # If flag2 not found, remove flag1
-                    parts.remove(flag1)
-        
-        return ' '.join(parts)
+        return ' '.join(self._fix_conflicts_tokens(command.split(), _conflict_pairs(errors)))
+    
+    def _fix_conflicts_tokens(self, parts: List[str],
+                              conflict_pairs: Iterable[Tuple[str, str]]) -> List[str]:
+        """
+        _fix_conflicts on an already split command and parsed (flag1, flag2)
+        pairs (returns parts if unchanged)
+        """
+        # Positions of every token, built once
+        positions: Dict[str, List[int]] = {}
+        for i, part in enumerate(parts):
+            positions.setdefault(part, []).append(i)
+        drop = set()
+        
+        for flag1, flag2 in conflict_pairs:
+            # Remove second flag (every occurrence, so a duplicate
+            # does not bring the conflict back)
+            if flag2 in positions:
+                drop.update(positions.pop(flag2))
+            elif flag1 in positions and flag1 != flag2:
+                # If flag2 not found, remove flag1
+                drop.update(positions.pop(flag1))
+        
+        if not drop:
+            return parts
+        return [p for i, p in enumerate(parts) if i not in drop]
     
     def _fix_syntax(self, command: str, errors: List[str]) -> str:
         """
@@ -228,19 +327,31 @@ class SelfCorrector:
         Returns:
             Fixed command
         """
-        parts = command.split()
+        cmd = command.strip()
+        
+        # Already starts with nmap and has something after it
+        if cmd[:5] == 'nmap ':
+            return cmd
+        
+        return ' '.join(self._fix_syntax_tokens(cmd.split()))
+    
+    def _fix_syntax_tokens(self, parts: List[str]) -> List[str]:
+        """_fix_syntax on an already split command (returns parts if unchanged)"""
+        # Already well-formed
+        if len(parts) >= 2 and parts[0] == 'nmap':
+            return parts
         
         # Ensure starts with nmap
         if not parts or parts[0] != 'nmap':
-            parts.insert(0, 'nmap')
+            parts = ['nmap', *parts]
         
         # Ensure has at least one target
         # Check if last part looks like a target (IP or domain)
         if len(parts) < 2:
             # Add default target (localhost for testing)
-            parts.append('127.0.0.1')
+            parts = parts + ['127.0.0.1']
         
-        return ' '.join(parts)
+        return parts
     
     def _fix_safety(self, command: str) -> str:
         """
@@ -254,19 +365,11 @@ class SelfCorrector:
         Returns:
             Safer command
         """
-        import re
-        
-        # Remove file redirections
-        command = re.sub(r'\s*[>|<]+\s*\S*', '', command)
-        
-        # Remove command chaining
-        command = re.sub(r'\s*[;&|]+.*$', '', command)
+        # Remove file redirections and command chaining
+        command = _UNSAFE_RE.sub('', command)
         
         # Remove shell substitutions
-        command = re.sub(r'\$\([^)]*\)', '', command)
-        command = re.sub(r'`[^`]*`', '', command)
-        
-        return command.strip()
+        return _SUBST_RE.sub('', command).strip()
 
 
 # Convenience function for simple use
@@ -288,13 +391,17 @@ def correct_command(
     """
     corrector = SelfCorrector(max_retries=max_retries)
     
-    # Create a dummy generator that just returns the command
-    def generator(intent, complexity):
-        return command
+    # Dummy generator that just returns the command
+    generator = partial(_const_generator, command)
     
     return corrector.loop("", "MEDIUM", generator, validator_func)
 
 
+def _const_generator(command: str, intent: str, complexity: str) -> str:
+    """Generator for correct_command: always returns the given command"""
+    return command
+
+
 # Test
 if __name__ == "__main__":
     print("=" * 60)
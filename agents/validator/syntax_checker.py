@@ -4,8 +4,14 @@ Validates nmap command syntax without executing it
 """
 
 import re
-import subprocess
-from typing import Tuple
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+try:
+    from .conflict_checker import _FLAG_RE
+except ImportError:
+    # Fallback for running as script
+    from conflict_checker import _FLAG_RE  # type: ignore
 
 
 # Known nmap flags for basic validation
@@ -28,11 +34,31 @@ KNOWN_FLAGS = {
     '--script', '--script-args',
 }
 
+# Long flags accepted by _is_long_flag, exactly or as a prefix
+# (e.g. --script=default)
+KNOWN_LONG_FLAGS = frozenset({
+    '--script', '--script-args', '--traceroute', '--reason',
+    '--exclude-ports', '--port-ratio', '--version-intensity',
+    '--osscan-limit', '--max-retries', '--host-timeout',
+    '--open', '--version-all', '--version-light'
+})
+_LONG_FLAG_PREFIX_RE = re.compile(
+    '|'.join(re.escape(f) for f in sorted(KNOWN_LONG_FLAGS, key=len, reverse=True))
+)
+
+# Target formats accepted by _is_valid_target
+_DOMAIN_RE = re.compile(r'^([a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$')
+_HOST_RE = re.compile(r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?$')
+
 
+@lru_cache(maxsize=1024)
 def validate_syntax(command: str) -> Tuple[bool, str]:
     """
     Validate nmap command syntax
     
+    Results are cached per command string (the self-correction loop often
+    re-validates the same command); use validate_syntax.cache_clear() to reset.
+    
     Checks:
     1. Command starts with 'nmap'
     2. Has at least a target
@@ -45,13 +71,58 @@ def validate_syntax(command: str) -> Tuple[bool, str]:
     Returns:
         (is_valid, feedback_message)
     """
+    return _validate_syntax_impl(command.strip())
+
+
+_NOT_NMAP = (False, "Command must start with 'nmap'")
+
+
+def validate_syntax_batch(commands: List[str]) -> List[Tuple[bool, str]]:
+    """
+    Validate many commands at once
+    
+    Same results as [validate_syntax(c) for c in commands], but duplicates
+    are validated once per batch and the shared validate_syntax cache is
+    left alone, so a large batch does not evict the entries of the
+    interactive path.
+    
+    Args:
+        commands: Nmap command strings
+        
+    Returns:
+        (is_valid, feedback_message) for each command, in order
+    """
+    seen: Dict[str, Tuple[bool, str]] = {}
+    results = []
+    for command in commands:
+        result = seen.get(command)
+        if result is None:
+            stripped = command.strip()
+            if stripped[:4] != 'nmap':
+                result = _NOT_NMAP
+            else:
+                result = _validate_syntax_impl(stripped)
+            seen[command] = result
+        results.append(result)
+    return results
+
+
+def _validate_syntax_impl(command: str) -> Tuple[bool, str]:
+    """validate_syntax on an already stripped command (uncached)"""
+    return _validate_syntax_tokens(command.split())
+
+
+def _validate_syntax_tokens(parts: Sequence[str]) -> Tuple[bool, str]:
+    """
+    validate_syntax on a command already split on whitespace (uncached)
+    
+    Lets analyze_command reuse its own tokens instead of splitting again.
+    """
     # 1. Check starts with nmap
-    command = command.strip()
-    if not command.startswith('nmap'):
+    if not parts or parts[0][:4] != 'nmap':
         return False, "Command must start with 'nmap'"
     
-    # 2. Split and check length
-    parts = command.split()
+    # 2. Check length
     if len(parts) < 2:
         return False, "Command too short - missing target"
     
@@ -59,15 +130,18 @@ def validate_syntax(command: str) -> Tuple[bool, str]:
     flags = []
     targets = []
     
-    for i, part in enumerate(parts[1:], 1):  # Skip 'nmap'
-        if part.startswith('-'):
+    tokens = iter(parts)
+    next(tokens)  # Skip 'nmap'
+    prev_is_flag = False
+    for part in tokens:
+        is_flag = part.startswith('-')
+        if is_flag:
             flags.append(part)
-        else:
-            # Could be target or flag argument
-            if i > 1 and parts[i-1].startswith('-'):
-                # Argument to previous flag
-                continue
+        elif not prev_is_flag:
+            # Could be target or flag argument; a token right after a flag
+            # is its argument
             targets.append(part)
+        prev_is_flag = is_flag
     
     # 4. Must have at least one target
     if not targets:
@@ -100,94 +174,131 @@ def validate_syntax(command: str) -> Tuple[bool, str]:
     return True, "Syntax valid"
 
 
+@lru_cache(maxsize=256)
 def _is_valid_target(target: str) -> bool:
-    """Check if target is valid IP, CIDR, or domain"""
-    # IP address (simple check)
-    ip_pattern = r'^(\d{1,3}\.){3}\d{1,3}$'
-    if re.match(ip_pattern, target):
-        # Check each octet is 0-255
-        octets = target.split('.')
-        return all(0 <= int(o) <= 255 for o in octets)
+    """Check if target is valid IP, CIDR, or domain (cached, targets repeat)"""
+    # IP address
+    if _parse_ipv4(target):
+        return True
     
     # CIDR notation
-    cidr_pattern = r'^(\d{1,3}\.){3}\d{1,3}/\d{1,2}$'
-    if re.match(cidr_pattern, target):
-        ip_part = target.split('/')[0]
-        cidr_part = int(target.split('/')[1])
-        return _is_valid_target(ip_part) and 0 <= cidr_part <= 32
+    ip_part, slash, cidr_part = target.partition('/')
+    if slash:
+        return _parse_cidr_bits(cidr_part) and _parse_ipv4(ip_part)
     
     # Domain name (basic check)
-    domain_pattern = r'^([a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$'
-    if re.match(domain_pattern, target):
+    if _DOMAIN_RE.match(target):
         return True
     
     # Hostname (single word)
-    if re.match(r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?$', target):
+    if _HOST_RE.match(target):
         return True
     
     return False
 
 
+def _parse_ipv4(s: str) -> bool:
+    """
+    Check s is a dotted-quad IPv4 address (four 1-3 digit octets, 0-255)
+    
+    Single pass over the characters, no regex, split or int() calls.
+    """
+    acc = 0
+    digits = 0
+    dots = 0
+    for ch in s:
+        if '0' <= ch <= '9':
+            acc = acc * 10 + (ord(ch) - 48)
+            digits += 1
+            if digits > 3 or acc > 255:
+                return False
+        elif ch == '.':
+            if digits == 0 or dots == 3:
+                return False
+            dots += 1
+            acc = 0
+            digits = 0
+        else:
+            return False
+    return dots == 3 and digits > 0
+
+
+def _parse_cidr_bits(s: str) -> bool:
+    """Check s is a 1-2 digit prefix length between 0 and 32"""
+    if not 1 <= len(s) <= 2:
+        return False
+    acc = 0
+    for ch in s:
+        if not '0' <= ch <= '9':
+            return False
+        acc = acc * 10 + (ord(ch) - 48)
+    return acc <= 32
+
+
 def _is_long_flag(flag: str) -> bool:
     """Check if double-dash flag is valid"""
-    known_long_flags = [
-        '--script', '--script-args', '--traceroute', '--reason',
-        '--exclude-ports', '--port-ratio', '--version-intensity',
-        '--osscan-limit', '--max-retries', '--host-timeout',
-        '--open', '--version-all', '--version-light'
-    ]
-    
     # Exact match
-    if flag in known_long_flags:
+    if flag in KNOWN_LONG_FLAGS:
         return True
     
     # Prefix match (for flags with arguments like --script=default)
-    for known in known_long_flags:
-        if flag.startswith(known):
-            return True
-    
-    return False
+    return _LONG_FLAG_PREFIX_RE.match(flag) is not None
 
 
-def _validate_with_nmap(command: str) -> bool:
+@lru_cache(maxsize=1)
+def _get_nmap_help() -> Optional[Tuple[str, FrozenSet[str]]]:
     """
-    Optional: Validate using nmap --help
-    This is slower but more accurate
+    Run nmap --help once per process
     
-    Args:
-        command: Command to validate
-        
     Returns:
-        True if nmap accepts the syntax
+        (help_text, flags listed in it), or None if nmap is not available
     """
+    # Imported here: strict validation is off by default and subprocess
+    # is comparatively slow to import
+    import subprocess
+    
     try:
-        # Run nmap with --help to check if flags are valid
         # This doesn't execute the scan
         result = subprocess.run(
             ['nmap', '--help'],
             capture_output=True,
             timeout=5
         )
-        
-        # Parse help output to check flags
-        help_text = result.stdout.decode()
-        
-        # Extract flags from command
-        flags = re.findall(r'-[a-zA-Z0-9]+|--[\w-]+', command)
-        
-        # Check each flag appears in help
-        for flag in flags:
-            # Remove any arguments (e.g., --script=default -> --script)
-            flag_base = flag.split('=')[0]
-            if flag_base not in help_text:
-                return False
-        
-        return True
-        
     except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+    
+    help_text = result.stdout.decode()
+    return help_text, frozenset(_FLAG_RE.findall(help_text))
+
+
+def _validate_with_nmap(command: str) -> bool:
+    """
+    Optional: Validate using nmap --help
+    This is slower but more accurate
+    
+    Args:
+        command: Command to validate
+        
+    Returns:
+        True if nmap accepts the syntax
+    """
+    nmap_help = _get_nmap_help()
+    if nmap_help is None:
         # If nmap not available or times out, return True
         # (we did basic checks already)
         return True
+    help_text, help_flags = nmap_help
+    
+    # Check each flag appears in help
+    for flag in _FLAG_RE.findall(command):
+        # Remove any arguments (e.g., --script=default -> --script)
+        flag_base = flag.split('=')[0]
+        # Set lookup first; substring search only for flags the help text
+        # mentions in another form (e.g. combined '-sS/sT/sA')
+        if flag_base not in help_flags and flag_base not in help_text:
+            return False
+    
+    return True
 
 
 # Quick validation for common mistakes
@@ -202,8 +313,9 @@ def quick_syntax_check(command: str) -> bool:
         True if passes basic checks
     """
     return (
-        command.strip().startswith('nmap') and
-        len(command.split()) >= 2
+        command.lstrip()[:4] == 'nmap' and
+        # At most 3 pieces: we only need to know there are two
+        len(command.split(None, 2)) >= 2
     )
 
 
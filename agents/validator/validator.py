@@ -11,15 +11,28 @@ This is your main deliverable that combines:
 6. Final decision (decision.py)
 """
 
-from typing import Dict, Optional, Callable
+from typing import Dict, Optional, Callable, Pattern, Tuple
+from collections import OrderedDict
+from functools import lru_cache
 import sys
 import os
+import asyncio
+import copy
+import dataclasses
+import logging
+import hashlib
+import json
+import importlib.util
+import re
 
-try:
-    from agents.comprehension.classifier import get_classifier
-    CLASSIFIER_AVAILABLE = True
-except ImportError:
-    CLASSIFIER_AVAILABLE = False
+logger = logging.getLogger(__name__)
+
+# P1's classifier (scikit-learn) is only imported by the first
+# get_complexity_from_nl call, so validating commands never loads it
+CLASSIFIER_AVAILABLE = (
+    importlib.util.find_spec('joblib') is not None
+    and importlib.util.find_spec('sklearn') is not None
+)
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -27,17 +40,19 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import all validation modules
 try:
     from .syntax_checker import validate_syntax
-    from .conflict_checker import validate_conflicts, check_requires_root
-    from .safety_checker import validate_safety, get_safety_warnings, check_safe_execution
-    from .self_correct import SelfCorrector
-    from .decision import make_decision
+    from .conflict_checker import ConflictChecker
+    from .safety_checker import validate_safety
+    from .self_correct import SelfCorrector, _conflict_pairs
+    from .decision import make_decision, Decision
+    from .analyzer import analyze_command
 except ImportError:
     # Fallback for running as script
     from syntax_checker import validate_syntax
-    from conflict_checker import validate_conflicts, check_requires_root
-    from safety_checker import validate_safety, get_safety_warnings, check_safe_execution
-    from self_correct import SelfCorrector
-    from decision import make_decision
+    from conflict_checker import ConflictChecker
+    from safety_checker import validate_safety
+    from self_correct import SelfCorrector, _conflict_pairs
+    from decision import make_decision, Decision
+    from analyzer import analyze_command
 
 # Optional VM simulation
 try:
@@ -45,7 +60,58 @@ try:
     HAS_VM_SIM = True
 except ImportError:
     HAS_VM_SIM = False
-    print("ℹ️  VM simulation not available (optional feature)")
+    logger.debug("VM simulation not available (optional feature)")
+
+
+# validate_and_suggest rules, first match wins for each error
+SUGGEST_RULES: Tuple[Tuple[Pattern[str], str], ...] = (
+    (re.compile('conflict', re.IGNORECASE), "Remove one of the conflicting flags"),
+    (re.compile('syntax', re.IGNORECASE), "Check command format: nmap [options] [target]"),
+    (re.compile('safety', re.IGNORECASE), "Remove dangerous patterns like >, |, ;"),
+)
+
+
+# Failed-check bits aggregated by full_validation
+STATUS_SYNTAX = 1
+STATUS_CONFLICT = 2
+STATUS_SAFETY = 4
+
+# Score for every combination of failed checks, indexed by the status bits
+# (syntax -0.3, conflict -0.4, safety -0.5, floored at 0)
+SCORE_TABLE: Tuple[float, ...] = (1.0, 0.7, 0.6, 0.3, 0.5, 0.2, 0.1, 0.0)
+
+
+def _kg_version(kg_client):
+    """
+    Cache token for a KG client's data
+    
+    The client's own 'version' attribute when it has one; otherwise its
+    identity, which changes only when the client is replaced. Neo4jClient
+    has no version, so edits made to the graph itself are not seen: call
+    clear_cache() after changing the KG.
+    """
+    if kg_client is None:
+        return None
+    version = getattr(kg_client, 'version', None)
+    return version if version is not None else f"id:{id(kg_client)}"
+
+
+def _copy_result(result: Dict[str, any]) -> Dict[str, any]:
+    """Copy a cached full_validation result down to its lists and check dicts"""
+    details = {}
+    for name, check in result['details'].items():
+        check = dict(check)
+        for key, value in check.items():
+            if isinstance(value, list):
+                check[key] = list(value)
+        details[name] = check
+    
+    copy = dict(result)
+    copy['errors'] = list(result['errors'])
+    copy['error_codes'] = [dict(code) for code in result['error_codes']]
+    copy['warnings'] = list(result['warnings'])
+    copy['details'] = details
+    return copy
 
 
 class CommandValidator:
@@ -76,19 +142,49 @@ class CommandValidator:
         if use_vm_sim and not HAS_VM_SIM:
             print("⚠️  VM simulation requested but not available")
     
-    def full_validation(self, command: str) -> Dict[str, any]:
+    @property
+    def kg_client(self):
+        return self._kg_client
+    
+    @kg_client.setter
+    def kg_client(self, kg_client):
+        """Replacing the KG client rebuilds the checker and drops cached results"""
+        self._kg_client = kg_client
+        # KG-or-fallback strategy is resolved once instead of on every command
+        self.conflict_checker = ConflictChecker(kg_client, auto_detect=True)
+        self._cached_validation = lru_cache(maxsize=4096)(self._validate_pure)
+    
+    def clear_cache(self):
+        """Forget memoized full_validation results (call after KG edits)"""
+        self._cached_validation.cache_clear()
+    
+    def full_validation(self, command: str, fast_fail: bool = True) -> Dict[str, any]:
         """
         Run complete validation pipeline
         
+        Results are memoized per command string and KG client (the
+        correction loop and API callers re-validate the same commands); each
+        call returns a fresh copy, so callers may mutate it. VM simulation
+        is never cached. The memo does not notice edits to the graph data
+        behind the client: call clear_cache() after changing the KG.
+        
         Steps:
         1. Syntax check
         2. Conflict detection (via KG if available)
         3. Safety check
-        4. VM simulation (if enabled and all above pass)
-        5. Aggregate results
+        4. Root requirement
+        5. VM simulation (if enabled and all above pass)
+        6. Aggregate results
+        
+        With fast_fail, a command failing the syntax check skips the conflict
+        and root steps (and their KG queries); "conflicts" and "root" are then
+        missing from details. The safety check always runs so dangerous
+        patterns are reported either way.
         
         Args:
             command: Nmap command to validate
+            fast_fail: Stop after a syntax failure (default: True); pass
+                False for full diagnostics
             
         Returns:
             {
@@ -96,33 +192,75 @@ class CommandValidator:
                 "score": float (0-1),
                 "feedback": str,
                 "errors": list of error messages,
+                "error_codes": list of {"code": SYNTAX | CONFLICT | SAFETY, ...}
+                    (CONFLICT entries carry the "flags" pair to remove),
                 "warnings": list of warnings,
                 "details": dict with individual check results
             }
         """
+        if self.use_vm_sim:
+            return self._validate_pure(command, fast_fail=fast_fail)
+        
+        kg_version = _kg_version(self.conflict_checker.kg_client)
+        return _copy_result(self._cached_validation(command, kg_version, fast_fail))
+    
+    async def full_validation_async(self, command: str, fast_fail: bool = True) -> Dict[str, any]:
+        """
+        full_validation for async callers (FastAPI endpoints)
+        
+        The text-only checks take microseconds and run inline. When a
+        Knowledge Graph or VM simulation is in use, the validation runs in a
+        worker thread so their blocking I/O does not stall the event loop.
+        """
+        if self.conflict_checker.kg_client is None and not self.use_vm_sim:
+            return self.full_validation(command, fast_fail)
+        return await asyncio.to_thread(self.full_validation, command, fast_fail)
+    
+    def _validate_pure(self, command: str, kg_version=None,
+                       fast_fail: bool = True) -> Dict[str, any]:
+        """Uncached full_validation; kg_version only takes part in the cache key"""
         errors = []
+        error_codes = []
         warnings = []
-        score = 1.0
+        status = 0
         details = {}
         
+        # Tokens, flags and safety scans are computed once and shared by all steps
+        analysis = analyze_command(command)
+        
         # Step 1: Syntax validation
-        syntax_valid, syntax_msg = validate_syntax(command)
+        syntax_valid, syntax_msg = analysis.syntax_valid, analysis.syntax_message
         details['syntax'] = {"valid": syntax_valid, "message": syntax_msg}
         
         if not syntax_valid:
             errors.append(f"Syntax: {syntax_msg}")
-            score -= 0.3
+            error_codes.append({"code": "SYNTAX", "message": syntax_msg})
+            status |= STATUS_SYNTAX
         
-        # Step 2: Conflict detection
-        conflict_valid, conflict_msg = validate_conflicts(command, self.kg_client)
-        details['conflicts'] = {"valid": conflict_valid, "message": conflict_msg}
+        run_later_stages = syntax_valid or not fast_fail
         
-        if not conflict_valid:
-            errors.append(f"Conflict: {conflict_msg}")
-            score -= 0.4
+        # Step 2: Conflict detection
+        if run_later_stages:
+            conflict_valid, conflict_msg = self.conflict_checker.validate(
+                command, flags=analysis.flags
+            )
+            details['conflicts'] = {"valid": conflict_valid, "message": conflict_msg}
+            
+            if not conflict_valid:
+                errors.append(f"Conflict: {conflict_msg}")
+                pairs = _conflict_pairs([conflict_msg])
+                error_codes.append({
+                    "code": "CONFLICT",
+                    "message": conflict_msg,
+                    "flags": pairs[0] if pairs else None
+                })
+                status |= STATUS_CONFLICT
         
         # Step 3: Safety check
-        safety_valid, safety_errors, safety_warnings = check_safe_execution(command)
+        safety_valid = analysis.safe
+        safety_errors = list(analysis.safety_errors)
+        # Deduplicated once; details and the top-level warnings share the result
+        safety_warnings = list(dict.fromkeys(analysis.safety_warnings))
         details['safety'] = {
             "valid": safety_valid,
             "errors": safety_errors,
@@ -131,16 +269,22 @@ class CommandValidator:
         
         if not safety_valid:
             errors.extend([f"Safety: {e}" for e in safety_errors])
-            score -= 0.5
+            error_codes.extend({"code": "SAFETY", "message": e} for e in safety_errors)
+            status |= STATUS_SAFETY
         
         warnings.extend(safety_warnings)
         
         # Step 4: Check root requirement
-        requires_root, root_flags = check_requires_root(command, self.kg_client)
-        details['root'] = {"required": requires_root, "flags": root_flags}
+        if run_later_stages:
+            requires_root, root_flags = self.conflict_checker.requires_root(
+                command, flags=analysis.flags
+            )
+            details['root'] = {"required": requires_root, "flags": root_flags}
+            
+            if requires_root:
+                warnings.append(f"Requires root privileges for: {', '.join(root_flags)}")
         
-        if requires_root:
-            warnings.append(f"Requires root privileges for: {', '.join(root_flags)}")
+        score = SCORE_TABLE[status]
         
         # Step 5: VM simulation (optional, only if syntax valid and no errors)
         if self.use_vm_sim and syntax_valid and len(errors) == 0:
@@ -162,9 +306,6 @@ class CommandValidator:
                 warnings.append(f"VM simulation failed: {str(e)}")
                 details['vm'] = {"error": str(e)}
         
-        # Calculate final score (ensure in range 0-1)
-        score = max(0.0, min(1.0, score))
-        
         # Determine overall validity
         is_valid = len(errors) == 0 and score >= 0.5
         
@@ -182,6 +323,7 @@ class CommandValidator:
             "score": score,
             "feedback": feedback,
             "errors": errors,
+            "error_codes": error_codes,
             "warnings": warnings,
             "details": details
         }
@@ -219,12 +361,10 @@ class CommandValidator:
         suggestions = []
         
         for error in result['errors']:
-            if 'conflict' in error.lower():
-                suggestions.append("Remove one of the conflicting flags")
-            elif 'syntax' in error.lower():
-                suggestions.append("Check command format: nmap [options] [target]")
-            elif 'safety' in error.lower():
-                suggestions.append("Remove dangerous patterns like >, |, ;")
+            for pattern, suggestion in SUGGEST_RULES:
+                if pattern.search(error):
+                    suggestions.append(suggestion)
+                    break
         
         result['suggestions'] = suggestions
         return result
@@ -235,14 +375,19 @@ class CommandValidator:
             return None
     
         try:
-            classifier = get_classifier()
-            result = classifier.comprehend(natural_language_query)
-            return result.get('complexity')
+            return _classify(natural_language_query)
         except Exception as e:
             print(f"Classifier error: {e}")
             return None
 
 
+@lru_cache(maxsize=4096)
+def _classify(query: str) -> Optional[str]:
+    """Complexity of a query from P1's classifier (cached, queries recur)"""
+    from agents.comprehension.classifier import get_classifier
+    return get_classifier().comprehend(query).get('complexity')
+
+
 class ValidationPipeline:
     """
     Complete validation pipeline with self-correction and decision
@@ -251,25 +396,105 @@ class ValidationPipeline:
     - Validation (CommandValidator)
     - Self-correction (SelfCorrector)
     - Final decision (make_decision)
+    
+    With cache_enabled, decisions are cached per (intent, complexity,
+    generator, KG client) in an in-process LRU. Only enable it for
+    deterministic generators. Generators are told apart by identity unless
+    process() is given a cache_key naming them; only those entries also go
+    to Redis (if a Redis client is given), and are shared between processes
+    only when the KG client exposes a 'version' token (see _kg_version).
+    Call clear_cache() after changing the KG; Redis entries then expire
+    after cache_ttl.
     """
     
-    def __init__(self, kg_client=None, max_retries: int = 3):
+    CACHE_SIZE = 2048
+    
+    def __init__(self, kg_client=None, max_retries: int = 3,
+                 cache_enabled: bool = False, redis_client=None,
+                 cache_ttl: int = 3600):
         """
         Initialize pipeline
         
         Args:
             kg_client: Knowledge Graph client
             max_retries: Max self-correction attempts
+            cache_enabled: Cache decisions for repeated requests (default: False)
+            redis_client: Optional redis.Redis shared by several processes
+            cache_ttl: Expiry of Redis entries, in seconds
         """
         self.validator = CommandValidator(kg_client=kg_client)
         self.corrector = SelfCorrector(max_retries=max_retries)
+        self.cache_enabled = cache_enabled
+        self._l1 = OrderedDict()
+        self._l2 = redis_client
+        self.cache_ttl = cache_ttl
+    
+    def _cache_key(self, intent: str, complexity: str, generator_func: Callable,
+                   cache_key: Optional[str] = None):
+        """
+        Key of everything a decision depends on
+        
+        A digest string (usable in Redis) when the caller names the generator
+        with cache_key; otherwise a tuple holding the generator itself, so
+        that two lambdas or closures never share an entry.
+        """
+        kg_version = _kg_version(self.validator.conflict_checker.kg_client)
+        if cache_key is None:
+            return (intent, complexity, generator_func, kg_version)
+        raw = f"{intent}|{complexity}|{cache_key}|{kg_version}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    
+    def _cache_get(self, key):
+        """Look up L1, then L2 (promoting L2 hits into L1)"""
+        decision = self._l1.get(key)
+        if decision is not None:
+            self._l1.move_to_end(key)
+            return decision
+        
+        if self._l2 is not None and isinstance(key, str):
+            try:
+                blob = self._l2.get(key)
+            except Exception:
+                # Redis is only a cache: an outage must not fail the request
+                return None
+            if blob is not None:
+                # JSON, not pickle: whoever can write to the shared Redis
+                # must not be able to run code in this process
+                try:
+                    decision = Decision.from_dict(json.loads(blob))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    # Corrupt or foreign entry: recompute and overwrite it
+                    return None
+                self._cache_put_l1(key, decision)
+                return decision
+        return None
+    
+    def _cache_put_l1(self, key, decision) -> None:
+        self._l1[key] = decision
+        if len(self._l1) > self.CACHE_SIZE:
+            self._l1.popitem(last=False)
+    
+    def _cache_put(self, key, decision) -> None:
+        """Write through both tiers (L2 only for named generators)"""
+        self._cache_put_l1(key, decision)
+        if self._l2 is not None and isinstance(key, str):
+            try:
+                self._l2.setex(key, self.cache_ttl, json.dumps(decision.to_dict()))
+            except Exception:
+                pass
+    
+    def clear_cache(self) -> None:
+        """Drop the in-process decision and validation caches"""
+        self._l1.clear()
+        self.validator.clear_cache()
     
     def process(
         self,
         intent: str,
         complexity: str,
-        generator_func: Callable
-    ) -> Dict[str, any]:
+        generator_func: Callable,
+        cache_key: Optional[str] = None
+    ) -> Decision:
         """
         Complete pipeline: generate → validate → correct → decide
         
@@ -277,10 +502,25 @@ class ValidationPipeline:
             intent: User's natural language intent
             complexity: EASY | MEDIUM | HARD
             generator_func: Function that generates commands
+            cache_key: Stable name of generator_func; lets cached decisions
+                be shared through Redis (default: cache in-process only)
             
         Returns:
             Final decision with command, confidence, explanation
         """
+        if self.cache_enabled:
+            key = self._cache_key(intent, complexity, generator_func, cache_key)
+            decision = self._cache_get(key)
+            if decision is None:
+                decision = self._process(intent, complexity, generator_func)
+                self._cache_put(key, decision)
+            # Cached decisions are shared: callers get their own copy
+            return copy.deepcopy(decision)
+        
+        return self._process(intent, complexity, generator_func)
+    
+    def _process(self, intent: str, complexity: str, generator_func: Callable):
+        """Uncached process()"""
         # Self-correction loop
         correction_result = self.corrector.loop(
             intent=intent,
@@ -301,9 +541,7 @@ class ValidationPipeline:
         )
         
         # Add correction history
-        decision['correction_history'] = correction_result['history']
-        
-        return decision
+        return dataclasses.replace(decision, correction_history=correction_result['history'])
 
 
 # Convenience function for simple use
@@ -11,11 +11,107 @@ This module:
 3. Calculates score based on results
 """
 
+import asyncio
+import os
 import subprocess
 import xml.etree.ElementTree as ET
+from functools import lru_cache
 from typing import Tuple, Optional, Dict
 import time
 
+# Optional on-disk cache of VM results (pip install diskcache)
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# Bytes read from the nmap pipe per feed of the pull parser
+_READ_CHUNK = 65536
+
+# Per-user directory: a fixed path under the shared temp dir could be
+# created first by another local user
+VM_CACHE_DIR = os.environ.get(
+    "NMAPAI_VM_CACHE",
+    os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "nmap_ai", "vm"
+    )
+)
+VM_CACHE_EXPIRE = 86400  # seconds
+
+_vm_cache = None
+
+
+def _private_dir(path: str) -> bool:
+    """Create path as 0700 if missing; True if it is ours and private"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        # Windows: no POSIX owner or mode bits; the per-user cache dir is
+        # protected by its ACLs
+        return True
+    st = os.stat(path)
+    if st.st_uid != os.getuid():
+        return False
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return True
+
+
+def _get_vm_cache():
+    """
+    Open the result cache on first use (None without diskcache)
+    
+    Entries are stored as JSON, not pickles. The cache is not used when its
+    directory belongs to another user.
+    """
+    global _vm_cache
+    if _vm_cache is None and DISKCACHE_AVAILABLE:
+        if not _private_dir(VM_CACHE_DIR):
+            print(f"⚠️  VM cache disabled: {VM_CACHE_DIR} is owned by another user")
+            return None
+        _vm_cache = diskcache.Cache(
+            VM_CACHE_DIR, size_limit=1 << 30, disk=diskcache.JSONDisk
+        )
+    return _vm_cache
+
+
+@lru_cache(maxsize=1)
+def _nmap_version() -> str:
+    """First line of `nmap -V`, part of the cache key (empty if unavailable)"""
+    try:
+        output = subprocess.run(['nmap', '-V'], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return output.split('\n', 1)[0]
+
+
+def _vm_cache_key(command: str, timeout: int) -> tuple:
+    return (tuple(command.split()), _nmap_version(), timeout)
+
+
+def invalidate_vm_cache(pattern: Optional[str] = None) -> int:
+    """
+    Remove cached VM results
+    
+    Args:
+        pattern: Only drop commands containing this substring (default: all)
+        
+    Returns:
+        Number of entries removed
+    """
+    cache = _get_vm_cache()
+    if cache is None:
+        return 0
+    if pattern is None:
+        return cache.clear()
+    
+    removed = 0
+    for key in list(cache.iterkeys()):
+        if pattern in ' '.join(key[0]) and cache.delete(key):
+            removed += 1
+    return removed
+
 
 def run_in_isolation(command: str, timeout: int = 30) -> bytes:
     """
@@ -34,10 +130,8 @@ def run_in_isolation(command: str, timeout: int = 30) -> bytes:
     Raises:
         subprocess.TimeoutExpired: If command takes too long
     """
-    # Ensure we get XML output
-    if '--oX' not in command and '-oX' not in command:
-        # Add XML output to stdout
-        command = command + ' --oX -'
+    # Ensure we get XML output on stdout
+    command = _with_xml_output(command)
     
     try:
         # Run command with timeout
@@ -64,6 +158,182 @@ def run_in_isolation(command: str, timeout: int = 30) -> bytes:
         return b""
 
 
+def _with_xml_output(command: str) -> str:
+    """Make nmap write its XML report to stdout"""
+    if '--oX' not in command and '-oX' not in command:
+        command = command + ' --oX -'
+    return command
+
+
+def _new_stats() -> Dict[str, any]:
+    """Empty statistics, as returned by extract_scan_stats"""
+    return {
+        'hosts_total': 0,
+        'hosts_up': 0,
+        'hosts_down': 0,
+        'ports_open': 0,
+        'ports_filtered': 0,
+        'ports_closed': 0,
+        'services_detected': [],
+        'scan_duration': 0.0,
+        'success': False
+    }
+
+
+class _ScanAccumulator:
+    """
+    Single pass over nmap XML computing both parse_xml's score and
+    extract_scan_stats' statistics
+    
+    Elements are consumed as their end tags arrive (XMLPullParser), and
+    every <host> is cleared once counted, so memory stays at one host
+    whatever the size of the scan.
+    """
+    
+    def __init__(self):
+        self.parser = ET.XMLPullParser(events=('end',))
+        self.total_hosts = 0
+        self.hosts_up = 0
+        self.stats = _new_stats()
+        self.failed = False
+    
+    def feed(self, chunk: bytes) -> None:
+        if self.failed:
+            return
+        try:
+            self.parser.feed(chunk)
+            self._drain()
+        except ET.ParseError as e:
+            print(f"XML parse error: {e}")
+            self.failed = True
+    
+    def close(self) -> None:
+        if self.failed:
+            return
+        try:
+            self.parser.close()
+            self._drain()
+        except ET.ParseError as e:
+            print(f"XML parse error: {e}")
+            self.failed = True
+    
+    def _drain(self) -> None:
+        stats = self.stats
+        for _, elem in self.parser.read_events():
+            tag = elem.tag
+            if tag == 'port':
+                state = elem.find('.//state')
+                if state is not None:
+                    port_state = state.get('state')
+                    if port_state == 'open':
+                        stats['ports_open'] += 1
+                        service = elem.find('.//service')
+                        if service is not None:
+                            service_name = service.get('name', 'unknown')
+                            if service_name not in stats['services_detected']:
+                                stats['services_detected'].append(service_name)
+                    elif port_state == 'filtered':
+                        stats['ports_filtered'] += 1
+                    elif port_state == 'closed':
+                        stats['ports_closed'] += 1
+            elif tag == 'host':
+                self.total_hosts += 1
+                status = elem.find('.//status')
+                if status is not None and status.get('state') == 'up':
+                    self.hosts_up += 1
+                elem.clear()
+            elif tag == 'hosts':
+                stats['hosts_total'] = int(elem.get('total', 0))
+                stats['hosts_up'] = int(elem.get('up', 0))
+                stats['hosts_down'] = int(elem.get('down', 0))
+            elif tag == 'finished':
+                stats['scan_duration'] = float(elem.get('elapsed', 0))
+    
+    def result(self) -> Tuple[float, Dict[str, any]]:
+        """(score, stats), like parse_xml and extract_scan_stats"""
+        if self.failed:
+            return 0.0, _new_stats()
+        
+        stats = self.stats
+        stats['success'] = stats['hosts_up'] > 0 or stats['ports_open'] > 0
+        score = self.hosts_up / self.total_hosts if self.total_hosts else 0.0
+        return score, stats
+
+
+def parse_scan(xml_bytes: bytes) -> Tuple[float, Dict[str, any]]:
+    """
+    parse_xml and extract_scan_stats in a single parse
+    
+    Args:
+        xml_bytes: XML output from nmap
+        
+    Returns:
+        (score, stats_dict)
+    """
+    if not xml_bytes:
+        return 0.0, _new_stats()
+    
+    # Fed in pipe-sized chunks: expat handles a single multi-MB feed much
+    # more slowly, and the accumulator then works the same on both paths
+    acc = _ScanAccumulator()
+    for start in range(0, len(xml_bytes), _READ_CHUNK):
+        acc.feed(xml_bytes[start:start + _READ_CHUNK])
+    acc.close()
+    return acc.result()
+
+
+async def run_and_parse(command: str, timeout: int = 30) -> Tuple[bool, float, Dict[str, any]]:
+    """
+    Run nmap without blocking the event loop and parse its XML as it streams
+    
+    Args:
+        command: Nmap command to execute
+        timeout: Maximum execution time in seconds (default: 30)
+        
+    Returns:
+        (got_output, score, stats_dict); no output on timeout or failure
+    """
+    command = _with_xml_output(command)
+    
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *command.split(),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        print("Error: nmap not found. Please install nmap.")
+        return False, 0.0, _new_stats()
+    
+    acc = _ScanAccumulator()
+    got_output = False
+    
+    async def consume():
+        nonlocal got_output
+        while True:
+            chunk = await proc.stdout.read(_READ_CHUNK)
+            if not chunk:
+                break
+            got_output = True
+            acc.feed(chunk)
+        await proc.wait()
+    
+    try:
+        await asyncio.wait_for(consume(), timeout)
+    except asyncio.TimeoutError:
+        print(f"Command timed out after {timeout}s: {command}")
+        proc.kill()
+        await proc.wait()
+        return False, 0.0, _new_stats()
+    
+    if not got_output:
+        return False, 0.0, _new_stats()
+    
+    acc.close()
+    score, stats = acc.result()
+    return True, score, stats
+
+
 def parse_xml(xml_bytes: bytes) -> float:
     """
     Parse nmap XML output and calculate success score
@@ -133,17 +403,7 @@ def extract_scan_stats(xml_bytes: bytes) -> Dict[str, any]:
     Returns:
         Dictionary with scan statistics
     """
-    stats = {
-        'hosts_total': 0,
-        'hosts_up': 0,
-        'hosts_down': 0,
-        'ports_open': 0,
-        'ports_filtered': 0,
-        'ports_closed': 0,
-        'services_detected': [],
-        'scan_duration': 0.0,
-        'success': False
-    }
+    stats = _new_stats()
     
     if not xml_bytes:
         return stats
@@ -192,31 +452,74 @@ def extract_scan_stats(xml_bytes: bytes) -> Dict[str, any]:
     return stats
 
 
-def validate_with_vm(command: str, timeout: int = 30) -> Tuple[bool, float, Dict]:
+def validate_with_vm(command: str, timeout: int = 30,
+                     use_cache: bool = True) -> Tuple[bool, float, Dict]:
     """
     Complete VM validation: run command and analyze results
     
+    With diskcache installed, results are cached on disk for a day per
+    (command, nmap version, timeout); runs without output are not cached.
+    
     Args:
         command: Nmap command to validate
         timeout: Maximum execution time
+        use_cache: Reuse / store cached results (default: True)
         
     Returns:
         (is_valid, score, stats_dict)
     """
+    cache = _get_vm_cache() if use_cache else None
+    if cache is not None:
+        key = _vm_cache_key(command, timeout)
+        cached = cache.get(key)
+        if cached is not None:
+            return tuple(cached)
+    
     # Run command
     xml_output = run_in_isolation(command, timeout)
     
     # Parse and score
-    score = parse_xml(xml_output)
-    stats = extract_scan_stats(xml_output)
+    score, stats = parse_scan(xml_output)
     
     # Determine validity
     # Valid if: score > 0.3 OR command executed without error
-    is_valid = score > 0.3 or (xml_output and len(xml_output) > 0)
+    is_valid = score > 0.3 or len(xml_output) > 0
+    
+    if cache is not None and xml_output:
+        cache.set(key, (is_valid, score, stats), expire=VM_CACHE_EXPIRE)
     
     return is_valid, score, stats
 
 
+async def validate_with_vm_async(command: str, timeout: int = 30,
+                                 use_cache: bool = True) -> Tuple[bool, float, Dict]:
+    """
+    validate_with_vm for async callers; the XML is scored while nmap runs
+    
+    Args:
+        command: Nmap command to validate
+        timeout: Maximum execution time
+        use_cache: Reuse / store cached results (default: True)
+        
+    Returns:
+        (is_valid, score, stats_dict)
+    """
+    cache = _get_vm_cache() if use_cache else None
+    if cache is not None:
+        key = _vm_cache_key(command, timeout)
+        cached = cache.get(key)
+        if cached is not None:
+            return tuple(cached)
+    
+    got_output, score, stats = await run_and_parse(command, timeout)
+    result = (score > 0.3 or got_output, score, stats)
+    
+    if cache is not None and got_output:
+        cache.set(key, result, expire=VM_CACHE_EXPIRE)
+    
+    return result
+
+
 # Quick test against localhost (safe)
 def quick_localhost_test() -> bool:
     """
@@ -8,8 +8,16 @@ Integrated Pipeline:
 - P4: Validation & Decision (/api/validate, /api/generate)
 """
 
+from contextlib import asynccontextmanager
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+import os
 import sys
 from pathlib import Path
 import uvicorn
@@ -18,6 +26,94 @@ import uvicorn
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+# orjson serializes the validation responses several times faster than the
+# stdlib encoder; fall back to it when orjson is not installed
+try:
+    import orjson  # noqa: F401
+    DEFAULT_RESPONSE_CLASS = ORJSONResponse
+except ImportError:
+    DEFAULT_RESPONSE_CLASS = JSONResponse
+
+# ============================================================================
+# Logging
+# ============================================================================
+
+# Records of the "api" loggers (this module and the routers) are queued and
+# written to stderr by a listener thread, so endpoints never wait on the
+# terminal; the listener is drained and stopped at interpreter exit
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+_api_logger = logging.getLogger("api")
+if not _api_logger.handlers:
+    _api_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    _api_logger.setLevel(logging.INFO)
+    _api_logger.propagate = False
+
+logger = logging.getLogger("api.main")
+
+STARTUP_BANNER = """
+======================================================================
+🚀 NMAP-AI UNIFIED API STARTING...
+======================================================================
+
+📦 Architecture: P1 + P2 (direct) + P4
+
+📡 Available endpoints:
+   • GET  /              - API info
+   • GET  /health        - Health check
+   • GET  /docs          - Swagger UI
+
+   P1 Comprehension:
+   • POST /comprehend    - Analyze query
+
+   P4 Validation + P2 Generation (integrated):
+   • POST /api/validate  - Validate command
+   • POST /api/generate  - Generate & validate (full pipeline)
+   • GET  /api/status    - Service status
+
+======================================================================
+✅ Server ready at http://localhost:8000
+📚 Documentation at http://localhost:8000/docs
+======================================================================"""
+
+# ============================================================================
+# Startup/Shutdown
+# ============================================================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-worker startup and shutdown (replaces the on_event hooks)"""
+    logger.info(STARTUP_BANNER)
+    
+    # Load models and run a warm-up generation before serving, so the first
+    # requests do not absorb that latency (NMAP_AI_PRELOAD=0 to skip, e.g.
+    # for fast dev reloads)
+    if os.getenv("NMAP_AI_PRELOAD", "1") == "1":
+        try:
+            nmap_ai = sys.modules.get("api.routers.nmap_ai")
+            if nmap_ai is not None:
+                await nmap_ai.warmup()
+            comprehend = sys.modules.get("api.routers.comprehend")
+            if comprehend is not None:
+                await asyncio.to_thread(comprehend.comprehension.get_classifier)
+        except Exception as e:
+            # Endpoints still load lazily; a failed warm-up must not stop startup
+            logger.warning("Model warm-up failed: %s", e)
+    
+    yield
+    
+    # Release the worker's HARD service connections and generator task
+    nmap_ai = sys.modules.get("api.routers.nmap_ai")
+    if nmap_ai is not None:
+        await nmap_ai.shutdown()
+    logger.info("🛑 NMAP-AI API shutting down...")
+
+
 # ============================================================================
 # Create FastAPI App
 # ============================================================================
@@ -27,110 +123,118 @@ app = FastAPI(
     description="AI-powered Natural Language to Nmap Command Generator with Knowledge Graph RAG and Advanced Validation",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=DEFAULT_RESPONSE_CLASS,
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+# Add CORS middleware; browsers cache the preflight for a day (max_age)
+# instead of sending an OPTIONS request before every cross-origin POST
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 # ============================================================================
 # Include Routers
 # ============================================================================
 
+# Routers can be switched off (NMAP_AI_ENABLE_P1=0 / NMAP_AI_ENABLE_P2=0)
+# so a dev server that does not need them skips their imports on reload
+ENABLE_P1 = os.getenv("NMAP_AI_ENABLE_P1", "1") == "1"
+ENABLE_P2 = os.getenv("NMAP_AI_ENABLE_P2", "1") == "1"
+
 # Router 1: P1 Comprehension
-try:
-    from api.routers import comprehend
-    app.include_router(comprehend.router)
-    print("✅ P1 Comprehension router loaded")
-except ImportError as e:
-    print(f"⚠️  Warning: Could not load comprehend router: {e}")
+if ENABLE_P1:
+    try:
+        from api.routers import comprehend
+        app.include_router(comprehend.router)
+        logger.info("✅ P1 Comprehension router loaded")
+    except ImportError as e:
+        logger.warning("Could not load comprehend router: %s", e)
 
 # Router 2: P4 Validator + P2 Generator (Direct Import)
-try:
-    from api.routers import nmap_ai
-    app.include_router(nmap_ai.router, prefix="/api", tags=["NMAP-AI"])
-    print("✅ P4 Validator + P2 Generator router loaded (Direct Import)")
-except ImportError as e:
-    print(f"⚠️  Warning: Could not load nmap_ai router: {e}")
-    print("   Make sure nmap_ai.py uses direct P2 import")
-except Exception as e:
-    print(f"❌ Error loading nmap_ai router: {e}")
+if ENABLE_P2:
+    try:
+        from api.routers import nmap_ai
+        app.include_router(nmap_ai.router, prefix="/api", tags=["NMAP-AI"])
+        logger.info("✅ P4 Validator + P2 Generator router loaded (Direct Import)")
+    except ImportError as e:
+        logger.warning("Could not load nmap_ai router: %s", e)
+    except Exception as e:
+        logger.error("Error loading nmap_ai router: %s", e)
 
 # ============================================================================
 # Root Endpoints
 # ============================================================================
 
+# Static payloads, encoded once at import instead of on every request
+ROOT_INFO = {
+    "name": "NMAP-AI Unified API",
+    "version": "2.0.0",
+    "description": "Complete P1+P2+P4 Pipeline",
+    "integration_mode": "direct_import",
+    "architecture": "P1 (comprehension) + P2 (generation via direct import) + P4 (validation)",
+    "docs": "/docs",
+    "endpoints": {
+        "comprehension": {
+            "POST /comprehend": "Analyze query complexity (P1)",
+            "GET /comprehend/health": "P1 health check"
+        },
+        "generation_and_validation": {
+            "POST /api/generate": "Generate & validate nmap command (P1+P2+P4)",
+            "POST /api/validate": "Validate nmap command (P4)",
+            "GET /api/status": "Service status"
+        },
+        "documentation": {
+            "GET /docs": "Swagger UI",
+            "GET /health": "Global health check"
+        }
+    }
+}
+
+HEALTH_INFO = {
+    "status": "healthy",
+    "service": "nmap-ai-unified-api"
+}
+
+
+class _StaticJSONResponse(Response):
+    """
+    Prebuilt JSON response returned as-is by every request
+    
+    Each send gets a copy of the headers: middleware such as CORS appends
+    to the start message's header list in place, which would otherwise
+    pile up on the shared instance.
+    """
+    media_type = "application/json"
+    
+    async def __call__(self, scope, receive, send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": list(self.raw_headers)
+        })
+        await send({"type": "http.response.body", "body": self.body})
+
+
+_ROOT_RESPONSE = _StaticJSONResponse(DEFAULT_RESPONSE_CLASS(ROOT_INFO).body)
+_HEALTH_RESPONSE = _StaticJSONResponse(DEFAULT_RESPONSE_CLASS(HEALTH_INFO).body)
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "name": "NMAP-AI Unified API",
-        "version": "2.0.0",
-        "description": "Complete P1+P2+P4 Pipeline",
-        "integration_mode": "direct_import",
-        "architecture": "P1 (comprehension) + P2 (generation via direct import) + P4 (validation)",
-        "docs": "/docs",
-        "endpoints": {
-            "comprehension": {
-                "POST /comprehend": "Analyze query complexity (P1)",
-                "GET /comprehend/health": "P1 health check"
-            },
-            "generation_and_validation": {
-                "POST /api/generate": "Generate & validate nmap command (P1+P2+P4)",
-                "POST /api/validate": "Validate nmap command (P4)",
-                "GET /api/status": "Service status"
-            },
-            "documentation": {
-                "GET /docs": "Swagger UI",
-                "GET /health": "Global health check"
-            }
-        }
-    }
+    return _ROOT_RESPONSE
 
 @app.get("/health")
 async def health():
     """Global health check"""
-    return {
-        "status": "healthy",
-        "service": "nmap-ai-unified-api"
-    }
-
-# ============================================================================
-# Startup/Shutdown Events
-# ============================================================================
-
-@app.on_event("startup")
-async def startup_event():
-    """Run on application startup"""
-    print("\n" + "=" * 70)
-    print("🚀 NMAP-AI UNIFIED API STARTING...")
-    print("=" * 70)
-    print("\n📦 Architecture: P1 + P2 (direct) + P4")
-    print("\n📡 Available endpoints:")
-    print("   • GET  /              - API info")
-    print("   • GET  /health        - Health check")
-    print("   • GET  /docs          - Swagger UI")
-    print("\n   P1 Comprehension:")
-    print("   • POST /comprehend    - Analyze query")
-    print("\n   P4 Validation + P2 Generation (integrated):")
-    print("   • POST /api/validate  - Validate command")
-    print("   • POST /api/generate  - Generate & validate (full pipeline)")
-    print("   • GET  /api/status    - Service status")
-    print("\n" + "=" * 70)
-    print("✅ Server ready at http://localhost:8000")
-    print("📚 Documentation at http://localhost:8000/docs")
-    print("=" * 70 + "\n")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Run on application shutdown"""
-    print("\n🛑 NMAP-AI API shutting down...")
+    return _HEALTH_RESPONSE
 
 # ============================================================================
 # Run Application
@@ -144,12 +248,24 @@ if __name__ == "__main__":
     print("   • http://localhost:8000")
     print("   • http://localhost:8000/docs (Swagger UI)")
     print("\n💡 Integration Mode: Direct Import (P2 inside P4)")
+    print("   Set RELOAD=1 for auto-reload during development")
     print("⚠️  Press Ctrl+C to stop\n")
     
+    # uvloop/httptools (uvicorn[standard]) are picked when installed;
+    # "auto" falls back to asyncio/h11 where they are not (e.g. Windows).
+    # Idle connections are kept for 75 s (uvicorn's default is 5 s) so
+    # clients sending a series of requests reuse their TCP connection.
+    reload = os.environ.get("RELOAD") == "1"
+    workers = os.environ.get("WORKERS", os.environ.get("WEB_CONCURRENCY", 1))
     uvicorn.run(
         "api.main:app",
         host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
+        port=int(os.environ.get("PORT", 8000)),
+        loop="auto",
+        http="auto",
+        timeout_keep_alive=int(os.environ.get("KEEP_ALIVE", 75)),
+        reload=reload,
+        workers=None if reload else int(workers),
+        access_log=reload,
+        log_level="info" if reload else "warning"
     )
\ No newline at end of file
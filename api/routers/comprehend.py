@@ -7,7 +7,9 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Union
 
-from agents.comprehension import get_classifier
+# get_classifier is looked up per request: agents.comprehension only loads
+# the scikit-learn classifier on first use
+from agents import comprehension
 
 
 router = APIRouter(prefix="/comprehend", tags=["comprehension"])
@@ -29,8 +31,10 @@ class ComprehendResponse(BaseModel):
     )
 
 
+# Plain def: FastAPI runs these in its threadpool, so loading and running
+# the scikit-learn classifier does not block the event loop
 @router.post("/", response_model=ComprehendResponse)
-async def comprehend_query(request: ComprehendRequest) -> ComprehendResponse:
+def comprehend_query(request: ComprehendRequest) -> ComprehendResponse:
     """
     Comprehend a natural language query.
     
@@ -49,7 +53,7 @@ async def comprehend_query(request: ComprehendRequest) -> ComprehendResponse:
         HTTPException: If classifier is not trained
     """
     try:
-        classifier = get_classifier()
+        classifier = comprehension.get_classifier()
         result = classifier.comprehend(request.query)
         
         return ComprehendResponse(**result)
@@ -67,7 +71,7 @@ async def comprehend_query(request: ComprehendRequest) -> ComprehendResponse:
 
 
 @router.get("/health")
-async def health_check():
+def health_check():
     """
     Check if the comprehension service is ready.
     
@@ -75,7 +79,7 @@ async def health_check():
         Status information
     """
     try:
-        classifier = get_classifier()
+        classifier = comprehension.get_classifier()
         
         # Try a simple test
         result = classifier.comprehend("test")
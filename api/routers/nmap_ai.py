@@ -4,46 +4,192 @@ REST endpoints for validation and command generation
 
 Endpoints:
 - POST /api/validate - Validate an nmap command
+- POST /api/validate/batch - Validate up to 256 commands in one request
 - POST /api/generate - Generate nmap command from natural language
 """
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
-import traceback
+from collections import OrderedDict
+import asyncio
+import json
+import os
+import re
 import httpx
 import time
 import logging
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by api.main (queued "api" logger)
 logger = logging.getLogger(__name__)
 
 # ============================================================================
 # HARD Model Service Configuration
 # ============================================================================
 HARD_MODEL_SERVICE_URL = "http://localhost:8001"
-_http_client: Optional[httpx.AsyncClient] = None
 
-# Import Person 4's validator
+# Endpoints that return a prebuilt response and one NDJSON line of the
+# streamed batch endpoint; orjson when installed, like the app's default
+# response class
 try:
-    from agents.validator.validator import CommandValidator
-    VALIDATOR_AVAILABLE = True
-except ImportError as e:
-    print(f"âš ï¸  Warning: Could not import CommandValidator: {e}")
-    VALIDATOR_AVAILABLE = False
-
-# Create router
-router = APIRouter()
-
-# Initialize validator (will be None if import failed)
-validator = None
-if VALIDATOR_AVAILABLE:
-    try:
-        validator = CommandValidator(kg_client=None)
-        print("OK CommandValidator initialized successfully")
-    except Exception as e:
-        print(f"âš ï¸  Warning: Could not initialize CommandValidator: {e}")
+    import orjson
+    
+    JSON_RESPONSE = ORJSONResponse
+    
+    def _json_line(obj: Dict[str, Any]) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    JSON_RESPONSE = JSONResponse
+    
+    def _json_line(obj: Dict[str, Any]) -> bytes:
+        return (json.dumps(obj) + "\n").encode()
+
+# Validations in flight per batch request
+BATCH_CONCURRENCY = (os.cpu_count() or 1) * 2
+
+# /generate responses by normalized query (LRU, valid responses only)
+GENERATE_CACHE_SIZE = 2048
+_generate_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# Stub /generate keywords, matched as substrings in one regex pass; the
+# lookahead finds overlapping hits ('support' holds both 'up' and 'port')
+_STUB_KEYWORDS = ('ping', 'check', 'up', 'web', 'http', 'ssh', 'all', 'port')
+_STUB_KEYWORD_RE = re.compile(r'(?=(%s))' % '|'.join(_STUB_KEYWORDS))
+_STUB_FLAGS = {keyword: 1 << i for i, keyword in enumerate(_STUB_KEYWORDS)}
+
+
+def _stub_rule(flags: int) -> tuple:
+    """(command, explanation) for a set of keyword flags, first rule wins"""
+    def has(*keywords: str) -> bool:
+        return all(flags & _STUB_FLAGS[k] for k in keywords)
+    
+    if has('ping') or has('check', 'up'):
+        return ("nmap -sn 192.168.1.0/24", "Ping scan to check which hosts are up")
+    if has('web') or has('http'):
+        return ("nmap -sV -p 80,443 192.168.1.0/24", "Scan for web servers with version detection")
+    if has('ssh'):
+        return ("nmap -sV -p 22 192.168.1.0/24", "Scan for SSH servers with version detection")
+    if has('all', 'port'):
+        return ("nmap -p- 192.168.1.1", "Scan all 65535 ports")
+    # Default command
+    return ("nmap -sV 192.168.1.1", "Basic scan with version detection (default for unrecognized query)")
+
+
+# Every keyword combination resolved once, indexed by its flags
+_STUB_TABLE = tuple(_stub_rule(flags) for flags in range(1 << len(_STUB_KEYWORDS)))
+
+# /validate bodies and /validate/quick verdicts by exact command (LRU); UIs
+# re-validate on every keystroke. Not normalized: the safety checks read the
+# raw text ('rm ' vs 'rm'). Cleared by POST /validate/cache/clear
+VALIDATE_CACHE_SIZE = 4096
+_validate_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_quick_cache: "OrderedDict[str, bool]" = OrderedDict()
+
+
+def _normalize(text: str) -> str:
+    """Cache key for a /generate query: runs of whitespace collapsed"""
+    return " ".join(text.split())
+
+
+def _cache_get(cache: OrderedDict, key: str):
+    """LRU lookup; None on a miss"""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: OrderedDict, key: str, value, size: int) -> None:
+    """LRU insert, evicting the least recently used entry past size"""
+    cache[key] = value
+    if len(cache) > size:
+        cache.popitem(last=False)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Create router; endpoints returning models or dicts encode with orjson
+# even when the router is mounted on an app without that default
+router = APIRouter(default_response_class=JSON_RESPONSE)
+
+# Person 4's validator is imported and built by the first request that
+# needs it, so importing this router (and /health, /docs) stays cheap
+VALIDATOR_AVAILABLE = True
+_validator = None
+_validator_lock: Optional[asyncio.Lock] = None
+
+
+async def _get_validator():
+    """
+    Shared CommandValidator, created on first use
+    
+    The validator is built in a worker thread, since connecting to Neo4j and
+    loading the KG options would otherwise block the event loop; the lock
+    makes concurrent first requests wait for that one build. Returns None
+    (and clears VALIDATOR_AVAILABLE) if the validator cannot be imported or
+    initialized.
+    """
+    global _validator, _validator_lock, VALIDATOR_AVAILABLE
+    
+    if _validator is not None or not VALIDATOR_AVAILABLE:
+        return _validator
+    
+    if _validator_lock is None:
+        _validator_lock = asyncio.Lock()
+    
+    async with _validator_lock:
+        if _validator is None and VALIDATOR_AVAILABLE:
+            try:
+                from agents.validator.validator import CommandValidator
+                _validator = await asyncio.to_thread(CommandValidator, kg_client=None)
+            except Exception as e:
+                logger.warning("Could not initialize CommandValidator: %s", e)
+                VALIDATOR_AVAILABLE = False
+    
+    return _validator
+
+
+# P2's T5 generator (easy/medium), loaded on first use when its adapter is
+# present; concurrent requests are coalesced into one batched forward pass
+P2_AVAILABLE = True
+_batched_generator = None
+_generator_lock: Optional[asyncio.Lock] = None
+
+
+async def _get_batched_generator():
+    """
+    Shared BatchedGenerator around the T5 model, or None
+    
+    The model is loaded in a worker thread so the event loop keeps serving
+    other requests meanwhile; the lock makes concurrent first requests wait
+    for that one load. Returns None (and clears P2_AVAILABLE) when torch or
+    the adapter is missing, so callers fall back to the stub generator.
+    """
+    global _batched_generator, _generator_lock, P2_AVAILABLE
+    
+    if _batched_generator is not None or not P2_AVAILABLE:
+        return _batched_generator
+    
+    if _generator_lock is None:
+        _generator_lock = asyncio.Lock()
+    
+    async with _generator_lock:
+        if _batched_generator is None and P2_AVAILABLE:
+            try:
+                from agents.easy_medium.t5_generator import (
+                    BatchedGenerator, DEFAULT_ADAPTER_PATH, get_generator
+                )
+                if not DEFAULT_ADAPTER_PATH.exists():
+                    raise FileNotFoundError(f"T5 adapter not found at {DEFAULT_ADAPTER_PATH}")
+                generator = await asyncio.to_thread(get_generator)
+                _batched_generator = BatchedGenerator(
+                    generator, max_batch=16, max_wait_ms=20.0
+                )
+            except Exception as e:
+                logger.warning("P2 generator unavailable, using stub generation: %s", e)
+                P2_AVAILABLE = False
+    
+    return _batched_generator
 
 
 # ============================================================================
@@ -64,6 +210,50 @@ async def get_http_client() -> httpx.AsyncClient:
     return _http_client
 
 
+async def close_http_client() -> None:
+    """Close the HARD service HTTP client (called on application shutdown)"""
+    global _http_client
+    
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def warmup() -> None:
+    """
+    Load the validator and T5 generator and run one generation per level
+    
+    Called from the application's lifespan so the first real request does
+    not pay for weight loading, KG option lookups or CUDA kernel setup.
+    """
+    validator = await _get_validator()
+    if validator is not None:
+        await validator.full_validation_async("nmap -sV 192.168.1.1")
+    
+    generator = await _get_batched_generator()
+    if generator is None:
+        return
+    
+    def run() -> None:
+        model = generator.generator
+        model.generate_batch(["scan for web servers on 192.168.1.1"] * 2, ["EASY", "MEDIUM"])
+        if model.device == "cuda":
+            from agents.easy_medium.t5_generator import torch
+            torch.cuda.synchronize()
+    
+    await asyncio.to_thread(run)
+
+
+async def shutdown() -> None:
+    """Release the router's resources (called on application shutdown)"""
+    global _batched_generator
+    
+    await close_http_client()
+    if _batched_generator is not None:
+        await _batched_generator.close()
+        _batched_generator = None
+
+
 async def check_hard_service_health() -> Dict[str, Any]:
     """Check if HARD model service is healthy"""
     try:
@@ -104,12 +294,11 @@ class ValidateRequest(BaseModel):
         example="nmap -sV -p 80,443 192.168.1.1"
     )
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "command": "nmap -sV -p 80,443 192.168.1.1"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "command": "nmap -sV -p 80,443 192.168.1.1"
         }
+    })
 
 
 class ValidateResponse(BaseModel):
@@ -124,22 +313,42 @@ class ValidateResponse(BaseModel):
     warnings: List[str] = Field(default_factory=list, description="List of warnings")
     details: Optional[Dict[str, Any]] = Field(None, description="Additional validation details")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "valid": True,
-                "is_valid": True,
-                "score": 0.95,
-                "feedback": "Command is valid and safe to execute",
-                "errors": [],
-                "warnings": ["This scan requires root privileges"],
-                "details": {
-                    "syntax": "valid",
-                    "conflicts": "none",
-                    "safety": "safe"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "valid": True,
+            "is_valid": True,
+            "score": 0.95,
+            "feedback": "Command is valid and safe to execute",
+            "errors": [],
+            "warnings": ["This scan requires root privileges"],
+            "details": {
+                "syntax": "valid",
+                "conflicts": "none",
+                "safety": "safe"
             }
         }
+    })
+
+
+class BatchValidateRequest(BaseModel):
+    """
+    Request to validate several nmap commands at once
+    """
+    commands: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=256,
+        description="Nmap commands to validate (at most 256)"
+    )
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "commands": [
+                "nmap -sV -p 80,443 192.168.1.1",
+                "nmap -sS -sT 192.168.1.1"
+            ]
+        }
+    })
 
 
 class GenerateRequest(BaseModel):
@@ -152,12 +361,11 @@ class GenerateRequest(BaseModel):
         example="Scan web servers with version detection on 192.168.1.0/24"
     )
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "query": "Scan web servers with version detection on 192.168.1.0/24"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "query": "Scan web servers with version detection on 192.168.1.0/24"
         }
+    })
 
 
 class GenerateResponse(BaseModel):
@@ -170,26 +378,25 @@ class GenerateResponse(BaseModel):
     validation: ValidateResponse = Field(..., description="Validation result")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "command": "nmap -sV -p 80,443 192.168.1.0/24",
-                "confidence": 0.92,
-                "explanation": "This command scans the network for web servers and detects their versions",
-                "validation": {
-                    "valid": True,
-                    "is_valid": True,
-                    "score": 0.95,
-                    "feedback": "Command is valid",
-                    "errors": [],
-                    "warnings": []
-                },
-                "metadata": {
-                    "complexity": "MEDIUM",
-                    "attempts": 1
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "command": "nmap -sV -p 80,443 192.168.1.0/24",
+            "confidence": 0.92,
+            "explanation": "This command scans the network for web servers and detects their versions",
+            "validation": {
+                "valid": True,
+                "is_valid": True,
+                "score": 0.95,
+                "feedback": "Command is valid",
+                "errors": [],
+                "warnings": []
+            },
+            "metadata": {
+                "complexity": "MEDIUM",
+                "attempts": 1
             }
         }
+    })
 
 
 
@@ -201,12 +408,11 @@ class HardGenerateRequest(BaseModel):
         example="UDP SNMP brute force on 10.0.0.1"
     )
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "query": "UDP SNMP brute force on 10.0.0.1"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "query": "UDP SNMP brute force on 10.0.0.1"
         }
+    })
 
 
 class HardGenerateResponse(BaseModel):
@@ -217,28 +423,34 @@ class HardGenerateResponse(BaseModel):
     confidence: float = Field(default=0.85, description="Confidence score")
     generation_time: Optional[float] = Field(None, description="Time taken to generate (seconds)")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "query": "UDP SNMP brute force on 10.0.0.1",
-                "command": "sudo nmap -sU --script snmp-brute -p 161 10.0.0.1",
-                "complexity": "HARD",
-                "confidence": 0.85,
-                "generation_time": 45.2
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "query": "UDP SNMP brute force on 10.0.0.1",
+            "command": "sudo nmap -sU --script snmp-brute -p 161 10.0.0.1",
+            "complexity": "HARD",
+            "confidence": 0.85,
+            "generation_time": 45.2
         }
+    })
 
 
 # ============================================================================
 # Endpoints
 # ============================================================================
 
-@router.post("/validate", response_model=ValidateResponse)
-async def validate_command(request: ValidateRequest) -> ValidateResponse:
+@router.post(
+    "/validate",
+    response_model=None,
+    responses={200: {"model": ValidateResponse}}
+)
+async def validate_command(request: ValidateRequest) -> Response:
     """
     Validate an nmap command
     
-    Person 4's main endpoint - validates syntax, conflicts, and safety
+    Person 4's main endpoint - validates syntax, conflicts, and safety.
+    The response is dumped to JSON by the model itself (pydantic-core),
+    skipping FastAPI's response_model validation and jsonable_encoder pass.
+    Bodies are cached per exact command string.
     
     Args:
         request: ValidateRequest with command to validate
@@ -250,33 +462,28 @@ async def validate_command(request: ValidateRequest) -> ValidateResponse:
         HTTPException: If validation service is unavailable or fails
     """
     # Check if validator is available
-    if not VALIDATOR_AVAILABLE or validator is None:
+    validator = await _get_validator()
+    if validator is None:
         raise HTTPException(
             status_code=503,
             detail="Validation service unavailable - CommandValidator not initialized"
         )
     
+    command = request.command
+    body = _cache_get(_validate_cache, command)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    
     try:
         # Validate the command
-        result = validator.full_validation(request.command)
-        
-        # Ensure both 'valid' and 'is_valid' are set
-        is_valid = result.get('is_valid', result.get('valid', False))
-        
-        return ValidateResponse(
-            valid=is_valid,
-            is_valid=is_valid,
-            score=result.get('score', 0.0),
-            feedback=result.get('feedback', 'Validation completed'),
-            errors=result.get('errors', []),
-            warnings=result.get('warnings', []),
-            details=result.get('details', {})
-        )
+        result = await validator.full_validation_async(command)
+        body = _to_validate_response(result).model_dump_json().encode()
+        _cache_put(_validate_cache, command, body, VALIDATE_CACHE_SIZE)
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         # Log the error
-        print(f"âŒ Validation error: {e}")
-        traceback.print_exc()
+        logger.exception("Validation error: %s", e)
         
         raise HTTPException(
             status_code=500,
@@ -284,51 +491,181 @@ async def validate_command(request: ValidateRequest) -> ValidateResponse:
         )
 
 
-@router.post("/generate", response_model=GenerateResponse)
-async def generate_command(request: GenerateRequest) -> GenerateResponse:
+def _validate_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the ValidateResponse fields from a full_validation result"""
+    # Ensure both 'valid' and 'is_valid' are set
+    is_valid = result.get('is_valid', result.get('valid', False))
+    
+    return {
+        "valid": is_valid,
+        "is_valid": is_valid,
+        "score": result.get('score', 0.0),
+        "feedback": result.get('feedback', 'Validation completed'),
+        "errors": result.get('errors', []),
+        "warnings": result.get('warnings', []),
+        "details": result.get('details', {})
+    }
+
+
+def _to_validate_response(result: Dict[str, Any]) -> ValidateResponse:
+    """
+    Build the API response from a full_validation result
+    
+    The validator's output already has the response types, so the model is
+    constructed without running field validation.
+    """
+    return ValidateResponse.model_construct(**_validate_payload(result))
+
+
+def _start_validations(validator, commands: List[str]) -> Dict[str, asyncio.Task]:
+    """
+    Start validating each distinct command once, concurrently
+    
+    At most BATCH_CONCURRENCY validations run at a time, so a large batch
+    hitting the KG does not take every worker thread of the server. Each
+    task resolves to the ValidateResponse fields as a plain dict.
+    """
+    unique = list(dict.fromkeys(commands))
+    limit = asyncio.Semaphore(max(1, min(len(unique), BATCH_CONCURRENCY)))
+    
+    async def validate(command: str) -> Dict[str, Any]:
+        async with limit:
+            return _validate_payload(await validator.full_validation_async(command))
+    
+    return {c: asyncio.ensure_future(validate(c)) for c in unique}
+
+
+async def _validate_unique(validator, commands: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Validate each distinct command once, concurrently"""
+    tasks = _start_validations(validator, commands)
+    try:
+        results = await asyncio.gather(*tasks.values())
+    finally:
+        # One validation failed: gather does not stop the others
+        for task in tasks.values():
+            task.cancel()
+    return dict(zip(tasks, results))
+
+
+@router.post(
+    "/validate/batch",
+    response_model=None,
+    responses={200: {"model": List[ValidateResponse]}}
+)
+async def validate_batch(request: BatchValidateRequest) -> JSONResponse:
+    """
+    Validate several nmap commands in one request
+    
+    Saves the HTTP round trip per command for bulk callers (dataset
+    curation, correction sweeps). Duplicate commands are validated once.
+    Rows are plain dicts serialized in one pass, not a ValidateResponse
+    model validated and dumped again per command.
+    
+    Args:
+        request: BatchValidateRequest with up to 256 commands
+        
+    Returns:
+        One ValidateResponse per command, in request order
+    """
+    validator = await _get_validator()
+    if validator is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Validation service unavailable - CommandValidator not initialized"
+        )
+    
+    try:
+        by_command = await _validate_unique(validator, request.commands)
+        return JSON_RESPONSE([by_command[c] for c in request.commands])
+    except Exception as e:
+        logger.exception("Batch validation error: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch validation failed: {str(e)}"
+        )
+
+
+@router.post("/validate/batch/stream")
+async def validate_batch_stream(request: BatchValidateRequest) -> StreamingResponse:
+    """
+    Validate several nmap commands, streaming one JSON line per command
+    
+    Lines are written in request order as soon as each result is ready;
+    every line is {"index": i, "command": ..., "result": ValidateResponse}.
+    """
+    validator = await _get_validator()
+    if validator is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Validation service unavailable - CommandValidator not initialized"
+        )
+    
+    async def lines():
+        # All commands are validated concurrently; lines still go out in order
+        tasks = _start_validations(validator, request.commands)
+        try:
+            for i, command in enumerate(request.commands):
+                yield _json_line({
+                    "index": i,
+                    "command": command,
+                    "result": await tasks[command]
+                })
+        finally:
+            # Client went away: drop the validations not streamed yet
+            for task in tasks.values():
+                task.cancel()
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/generate",
+    response_model=None,
+    responses={200: {"model": GenerateResponse}}
+)
+async def generate_command(request: GenerateRequest) -> JSONResponse:
     """
     Generate nmap command from natural language
     
     This is a STUB for Day 1 - returns a simple command
     Full implementation requires P1 (comprehension) and P2/P3 (generation)
     
+    The GenerateResponse is built here from trusted values, so it is sent
+    as-is instead of going through FastAPI's response_model round trip
+    (dump, re-validate, encode); the schema is still documented.
+    
     Args:
         request: GenerateRequest with natural language query
         
     Returns:
         GenerateResponse with generated command and validation
     """
+    # Repeated queries (up to case and spacing) reuse the validated response
+    cache_key = _normalize(request.query.lower())
+    cached = _cache_get(_generate_cache, cache_key)
+    if cached is not None:
+        return JSON_RESPONSE(cached)
+    
     # STUB IMPLEMENTATION - Day 1
     # TODO: Integrate with P1 (comprehension) and P2/P3 (generators)
     
     # For now, return a simple command based on keywords
-    query_lower = request.query.lower()
-    
-    # Simple keyword-based generation (STUB)
-    if 'ping' in query_lower or 'check' in query_lower and 'up' in query_lower:
-        command = "nmap -sn 192.168.1.0/24"
-        explanation = "Ping scan to check which hosts are up"
-    elif 'web' in query_lower or 'http' in query_lower:
-        command = "nmap -sV -p 80,443 192.168.1.0/24"
-        explanation = "Scan for web servers with version detection"
-    elif 'ssh' in query_lower:
-        command = "nmap -sV -p 22 192.168.1.0/24"
-        explanation = "Scan for SSH servers with version detection"
-    elif 'all' in query_lower and 'port' in query_lower:
-        command = "nmap -p- 192.168.1.1"
-        explanation = "Scan all 65535 ports"
-    else:
-        # Default command
-        command = "nmap -sV 192.168.1.1"
-        explanation = "Basic scan with version detection (default for unrecognized query)"
-    
-    # Validate the generated command
-    if VALIDATOR_AVAILABLE and validator is not None:
+    # Simple keyword-based generation (STUB): one scan of the lowercased
+    # key, then a table lookup
+    flags = 0
+    for match in _STUB_KEYWORD_RE.finditer(cache_key):
+        flags |= _STUB_FLAGS[match.group(1)]
+    command, explanation = _STUB_TABLE[flags]
+    
+    # Validate the generated command; the responses below are built from
+    # trusted values with model_construct (no field validation)
+    validator = await _get_validator()
+    if validator is not None:
         try:
-            validation_result = validator.full_validation(command)
+            validation_result = await validator.full_validation_async(command)
             is_valid = validation_result.get('is_valid', validation_result.get('valid', False))
             
-            validation = ValidateResponse(
+            validation = ValidateResponse.model_construct(
                 valid=is_valid,
                 is_valid=is_valid,
                 score=validation_result.get('score', 0.0),
@@ -342,9 +679,9 @@ async def generate_command(request: GenerateRequest) -> GenerateResponse:
             confidence = validation_result.get('score', 0.5)
             
         except Exception as e:
-            print(f"âš ï¸  Validation failed during generation: {e}")
+            logger.warning("Validation failed during generation: %s", e)
             # Return with low confidence if validation fails
-            validation = ValidateResponse(
+            validation = ValidateResponse.model_construct(
                 valid=False,
                 is_valid=False,
                 score=0.0,
@@ -355,7 +692,7 @@ async def generate_command(request: GenerateRequest) -> GenerateResponse:
             confidence = 0.3
     else:
         # If validator not available, return unvalidated
-        validation = ValidateResponse(
+        validation = ValidateResponse.model_construct(
             valid=True,
             is_valid=True,
             score=0.5,
@@ -365,7 +702,7 @@ async def generate_command(request: GenerateRequest) -> GenerateResponse:
         )
         confidence = 0.5
     
-    return GenerateResponse(
+    response = GenerateResponse.model_construct(
         command=command,
         confidence=confidence,
         explanation=f"{explanation}\n\nâš ï¸  Note: This is a STUB implementation (Day 1). "
@@ -378,6 +715,14 @@ async def generate_command(request: GenerateRequest) -> GenerateResponse:
             "stub": True
         }
     )
+    
+    payload = response.model_dump()
+    
+    # Error states and unvalidated fallbacks are not cached
+    if validator is not None and validation.is_valid:
+        _cache_put(_generate_cache, cache_key, payload, GENERATE_CACHE_SIZE)
+    
+    return JSON_RESPONSE(payload)
 
 
 @router.get("/status")
@@ -390,12 +735,13 @@ async def get_status():
     """
     # Check HARD service health
     hard_health = await check_hard_service_health()
+    validator_ready = await _get_validator() is not None
     
     return {
         "validator": {
-            "available": VALIDATOR_AVAILABLE and validator is not None,
-            "status": "online" if (VALIDATOR_AVAILABLE and validator is not None) else "offline",
-            "message": "Validator ready" if (VALIDATOR_AVAILABLE and validator is not None) else "Validator not initialized"
+            "available": validator_ready,
+            "status": "online" if validator_ready else "offline",
+            "message": "Validator ready" if validator_ready else "Validator not initialized"
         },
         "generator": {
             "available": False,
@@ -422,6 +768,8 @@ async def get_status():
         "endpoints": {
             "/api/validate": "Validate nmap commands (Person 4)",
             "/api/validate/quick": "Quick validation (True/False only)",
+            "/api/validate/batch": "Validate up to 256 commands at once",
+            "/api/validate/batch/stream": "Batch validation streamed as JSON lines",
             "/api/generate": "Generate nmap commands (STUB - Day 1)",
             "/api/generate/easy": "Generate EASY commands (simple scans)",
             "/api/generate/medium": "Generate MEDIUM commands (moderate complexity)",
@@ -442,14 +790,21 @@ async def quick_validate(request: ValidateRequest):
     
     Faster endpoint for simple validation checks
     """
-    if not VALIDATOR_AVAILABLE or validator is None:
+    validator = await _get_validator()
+    if validator is None:
         raise HTTPException(
             status_code=503,
             detail="Validation service unavailable"
         )
     
+    command = request.command
+    is_valid = _cache_get(_quick_cache, command)
+    if is_valid is not None:
+        return {"valid": is_valid}
+    
     try:
-        is_valid = validator.quick_validation(request.command)
+        is_valid = validator.quick_validation(command)
+        _cache_put(_quick_cache, command, is_valid, VALIDATE_CACHE_SIZE)
         return {"valid": is_valid}
     except Exception as e:
         raise HTTPException(
@@ -458,6 +813,23 @@ async def quick_validate(request: ValidateRequest):
         )
 
 
+@router.post("/validate/cache/clear")
+async def clear_validation_cache():
+    """
+    Drop cached validation results
+    
+    Call after the validator rules or the Knowledge Graph change; covers
+    /validate, /validate/quick, /generate and the validator's own memo.
+    """
+    cleared = len(_validate_cache) + len(_quick_cache) + len(_generate_cache)
+    _validate_cache.clear()
+    _quick_cache.clear()
+    _generate_cache.clear()
+    if _validator is not None:
+        _validator.clear_cache()
+    return {"cleared": cleared}
+
+
 
 # ============================================================================
 # HARD GENERATOR ENDPOINTS (Separate Service)
@@ -479,13 +851,12 @@ class EasyMediumGenerateRequest(BaseModel):
         pattern="^(EASY|MEDIUM)$"
     )
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "query": "Scan for SSH on 10.0.0.1",
-                "complexity": "EASY"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "query": "Scan for SSH on 10.0.0.1",
+            "complexity": "EASY"
         }
+    })
 
 
 class EasyMediumGenerateResponse(BaseModel):
@@ -496,16 +867,15 @@ class EasyMediumGenerateResponse(BaseModel):
     confidence: float = Field(..., description="Confidence score")
     generation_time: Optional[float] = Field(None, description="Time taken to generate (seconds)")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "query": "Scan for SSH on 10.0.0.1",
-                "command": "nmap -sV -p 22 10.0.0.1",
-                "complexity": "EASY",
-                "confidence": 0.90,
-                "generation_time": 1.2
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "query": "Scan for SSH on 10.0.0.1",
+            "command": "nmap -sV -p 22 10.0.0.1",
+            "complexity": "EASY",
+            "confidence": 0.90,
+            "generation_time": 1.2
         }
+    })
 
 
 @router.post("/generate/easy", response_model=EasyMediumGenerateResponse)
@@ -561,16 +931,20 @@ async def _generate_easy_medium_command(request: EasyMediumGenerateRequest) -> E
     """
     try:
         start_time = time.time()
-        logger.info(f"[{request.complexity}] Generating command for: {request.query}")
+        logger.debug("[%s] Generating command for: %s", request.complexity, request.query)
         
-        # Try P2 generator first (if available from commented code)
-        # For now, use enhanced stub generation
-        command = _enhanced_stub_generate(request.query, request.complexity)
+        # Try P2 generator first (batched with concurrent requests)
+        generator = await _get_batched_generator()
+        if generator is not None:
+            command = await generator.generate(request.query, request.complexity)
+        else:
+            command = _enhanced_stub_generate(request.query, request.complexity)
         
         # Validate the generated command
-        if VALIDATOR_AVAILABLE and validator is not None:
+        validator = await _get_validator()
+        if validator is not None:
             try:
-                validation_result = validator.full_validation(command)
+                validation_result = await validator.full_validation_async(command)
                 confidence = validation_result.get('score', 0.75)
             except Exception as e:
                 logger.warning(f"Validation failed: {e}")
@@ -579,7 +953,7 @@ async def _generate_easy_medium_command(request: EasyMediumGenerateRequest) -> E
             confidence = 0.7
         
         generation_time = time.time() - start_time
-        logger.info(f"OK Generated in {generation_time:.2f}s: {command}")
+        logger.debug("OK Generated in %.2fs: %s", generation_time, command)
         
         return EasyMediumGenerateResponse(
             query=request.query,
@@ -590,9 +964,7 @@ async def _generate_easy_medium_command(request: EasyMediumGenerateRequest) -> E
         )
         
     except Exception as e:
-        logger.error(f"ERR {request.complexity} generation failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("%s generation failed: %s", request.complexity, e)
         raise HTTPException(
             status_code=500,
             detail=f"{request.complexity} generation failed: {str(e)}"
@@ -726,7 +1098,7 @@ async def generate_hard_command(request: HardGenerateRequest):
         HTTPException: If service is unavailable or generation fails
     """
     try:
-        logger.info(f"[HARD]  Requesting HARD command generation for: {request.query}")
+        logger.debug("[HARD]  Requesting HARD command generation for: %s", request.query)
         start_time = time.time()
         
         # Call separate standalone hard model service
@@ -740,7 +1112,7 @@ async def generate_hard_command(request: HardGenerateRequest):
         result = response.json()
         elapsed = time.time() - start_time
         
-        logger.info(f"OK Generated in {elapsed:.1f}s: {result.get('command', 'N/A')}")
+        logger.debug("OK Generated in %.1fs: %s", elapsed, result.get('command', 'N/A'))
         
         return HardGenerateResponse(
             query=result.get("query", request.query),
@@ -771,9 +1143,7 @@ async def generate_hard_command(request: HardGenerateRequest):
         )
         
     except Exception as e:
-        logger.error(f"ERR Generation error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Generation error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Generation failed: {str(e)}"
@@ -784,17 +1154,11 @@ async def generate_hard_command(request: HardGenerateRequest):
 # Initialization Check
 # ============================================================================
 
-if not VALIDATOR_AVAILABLE:
-    print("âš ï¸  WARNING: CommandValidator not available!")
-    print("   Make sure agents/validator modules are properly installed")
-    print("   /api/validate endpoint will return 503 errors")
-else:
-    print("OK NMAP-AI router initialized with Person 4's validator")
-print("\n[HARD] HARD Generator Configuration:")
-print(f"   Service URL: {HARD_MODEL_SERVICE_URL}")
-print("   Status: Check /hard/health endpoint")
-print("   Note: HARD model runs as a separate service")
-print("   Start with: python hard_model_service.py")
+logger.info(
+    "HARD generator runs as a separate service at %s "
+    "(start with: python hard_model_service.py; status: /api/hard/health)",
+    HARD_MODEL_SERVICE_URL
+)
 
 
 
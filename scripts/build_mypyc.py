@@ -0,0 +1,55 @@
+"""
+Optional ahead-of-time build of the validator hot path with mypyc
+
+    pip install mypy
+    python scripts/build_mypyc.py          # compile the modules in place
+    python scripts/build_mypyc.py --clean  # remove the extensions again
+
+The compiled .so files sit next to the .py sources and take precedence on
+import. Deleting them (or --clean) brings back the pure-Python modules, which
+remain the reference implementation for development.
+"""
+
+import glob
+import os
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "agents/validator/safety_checker.py",
+    "agents/validator/conflict_checker.py",
+    "agents/validator/decision.py",
+    "agents/validator/analyzer.py",
+]
+
+
+def clean():
+    """Remove compiled extensions and mypyc build artifacts"""
+    patterns = [os.path.join(ROOT, "*__mypyc*.so")]
+    patterns += [os.path.join(ROOT, os.path.splitext(m)[0] + ".*.so") for m in MODULES]
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            print(f"Removing {os.path.relpath(path, ROOT)}")
+            os.remove(path)
+    shutil.rmtree(os.path.join(ROOT, "build"), ignore_errors=True)
+
+
+def build():
+    """Compile MODULES with mypyc, in place"""
+    try:
+        import mypyc  # noqa: F401
+    except ImportError:
+        sys.exit("mypyc not installed: pip install mypy")
+
+    subprocess.run([sys.executable, "-m", "mypyc", *MODULES], cwd=ROOT, check=True)
+    print("✅ Compiled: " + ", ".join(MODULES))
+
+
+if __name__ == "__main__":
+    if "--clean" in sys.argv[1:]:
+        clean()
+    else:
+        build()
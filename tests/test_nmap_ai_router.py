@@ -0,0 +1,114 @@
+"""
+Tests for the batch validation endpoints of the NMAP-AI router
+
+A stub validator stands in for CommandValidator, so these run without
+Neo4j and check only how the router schedules and orders validations.
+
+Run with:
+    pytest tests/test_nmap_ai_router.py -v
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+
+from api.routers import nmap_ai
+from api.routers.nmap_ai import BatchValidateRequest
+
+
+class StubValidator:
+    """Async full_validation with a per-command delay and optional failure"""
+
+    def __init__(self, delays=None, fail=None):
+        self.delays = delays or {}
+        self.fail = fail
+        self.calls = []
+        self.cancelled = []
+
+    async def full_validation_async(self, command):
+        self.calls.append(command)
+        if command == self.fail:
+            raise RuntimeError("KG unavailable")
+        try:
+            await asyncio.sleep(self.delays.get(command, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(command)
+            raise
+        return {'is_valid': True, 'score': 1.0, 'feedback': command}
+
+
+@pytest.fixture
+def use_validator(monkeypatch):
+    """Install a validator as the router's shared one"""
+    def install(validator):
+        monkeypatch.setattr(nmap_ai, "_validator", validator)
+        return validator
+    return install
+
+
+class TestValidateBatch:
+    """Test /validate/batch"""
+
+    def test_request_order_and_duplicates(self, use_validator):
+        """Test rows follow the request and duplicates are validated once"""
+        # The first command finishes last
+        validator = use_validator(StubValidator(delays={"nmap -sV a.com": 0.05}))
+        commands = ["nmap -sV a.com", "nmap b.com", "nmap -sV a.com", "nmap c.com"]
+
+        response = asyncio.run(nmap_ai.validate_batch(BatchValidateRequest(commands=commands)))
+        rows = json.loads(response.body)
+
+        assert [row["feedback"] for row in rows] == commands
+        assert sorted(validator.calls) == sorted(set(commands))
+
+    def test_error_cancels_remaining(self, use_validator):
+        """Test that one failing validation stops the others"""
+        validator = use_validator(StubValidator(
+            delays={"nmap slow.com": 10}, fail="nmap bad.com"
+        ))
+        request = BatchValidateRequest(commands=["nmap slow.com", "nmap bad.com"])
+
+        async def run():
+            with pytest.raises(HTTPException) as exc:
+                await nmap_ai.validate_batch(request)
+            assert exc.value.status_code == 500
+            # Checked before asyncio.run() cancels whatever is left
+            await asyncio.sleep(0)
+            assert validator.cancelled == ["nmap slow.com"]
+
+        asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    def test_empty_list(self):
+        """Test the helper with no commands (the endpoint requires at least one)"""
+        result = asyncio.run(asyncio.wait_for(
+            nmap_ai._validate_unique(StubValidator(), []), timeout=5
+        ))
+        assert result == {}
+
+
+class TestValidateBatchStream:
+    """Test /validate/batch/stream"""
+
+    def test_lines_in_request_order(self, use_validator):
+        """Test streamed lines follow the request, not completion order"""
+        use_validator(StubValidator(delays={"nmap a.com": 0.05}))
+        commands = ["nmap a.com", "nmap b.com", "nmap a.com"]
+
+        async def run():
+            response = await nmap_ai.validate_batch_stream(BatchValidateRequest(commands=commands))
+            return [json.loads(line) async for line in response.body_iterator]
+
+        lines = asyncio.run(run())
+        assert [line["index"] for line in lines] == [0, 1, 2]
+        assert [line["command"] for line in lines] == commands
+        assert [line["result"]["feedback"] for line in lines] == commands
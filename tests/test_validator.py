@@ -15,12 +15,17 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import validation modules
-from agents.validator.syntax_checker import validate_syntax, quick_syntax_check
-from agents.validator.conflict_checker import validate_conflicts, extract_flags, check_requires_root
+from agents.validator.syntax_checker import validate_syntax, quick_syntax_check, validate_syntax_batch
+from agents.validator.conflict_checker import (
+    validate_conflicts, extract_flags, check_requires_root, ConflictChecker,
+    validate_conflicts_batch
+)
 from agents.validator.safety_checker import validate_safety, check_safe_execution, get_safety_warnings
 from agents.validator.self_correct import SelfCorrector, correct_command
 from agents.validator.decision import make_decision, calculate_confidence
 from agents.validator.validator import CommandValidator, ValidationPipeline
+from agents.validator.analyzer import analyze_command
+from agents.validator.vm_sim import parse_scan, parse_xml, extract_scan_stats, _ScanAccumulator
 
 
 # ============================================================================
@@ -53,6 +58,15 @@ class TestSyntaxChecker:
         assert valid == False
         assert "target" in msg.lower()
     
+    def test_batch_matches_single(self):
+        """Test batch validation gives the same results as one by one"""
+        commands = [
+            "nmap 192.168.1.1", "scan 192.168.1.1", "nmap",
+            "  nmap -sV -p 80 scanme.nmap.org ", "nmap -sSSS 10.0.0.1",
+            "nmap 192.168.1.1",
+        ]
+        assert validate_syntax_batch(commands) == [validate_syntax(c) for c in commands]
+    
     def test_invalid_ip_address(self):
         """Test invalid IP address"""
         valid, msg = validate_syntax("nmap 999.999.999.999")
@@ -118,6 +132,27 @@ class TestConflictChecker:
         # -sT may or may not require root depending on implementation
         # Just check it returns a boolean
         assert isinstance(requires_root, bool)
+    
+    def test_conflict_checker_without_kg(self):
+        """Test checker bound to the hardcoded rules"""
+        checker = ConflictChecker(kg_client=None)
+        valid, msg = checker.validate("nmap -sS -sT 192.168.1.1")
+        assert valid == False
+        assert "fallback" in checker.validate("nmap -sS 192.168.1.1")[1]
+        assert checker.requires_root("nmap -sU 192.168.1.1") == (True, ['-sU'])
+    
+    def test_batch_matches_single(self):
+        """Test batch validation agrees with the fallback rules"""
+        commands = [
+            "nmap -sS -p 80 192.168.1.1",
+            "nmap -sS -sT 192.168.1.1",
+            "nmap -sn -p 80 192.168.1.1",
+            "nmap -Pn -PS 192.168.1.1",
+            "nmap -sS -sS 192.168.1.1",
+        ]
+        results = validate_conflicts_batch(commands)
+        assert list(results) == [ConflictChecker().validate(c)[0] for c in commands]
+        assert list(results) == [True, False, False, False, True]
 
 
 # ============================================================================
@@ -162,6 +197,29 @@ class TestSafetyChecker:
         assert any("aggressive" in w.lower() for w in warnings)
 
 
+# ============================================================================
+# Test Command Analyzer
+# ============================================================================
+
+class TestCommandAnalyzer:
+    """Test the single-pass command analysis"""
+    
+    def test_analysis_matches_individual_checks(self):
+        """Test fused analysis agrees with the standalone checkers"""
+        command = "nmap -sS -sT -O 192.168.1.1 > out.txt"
+        analysis = analyze_command(command)
+        assert analysis.flags == tuple(extract_flags(command))
+        assert analysis.conflict is not None
+        assert "-sS" in analysis.conflict and "-sT" in analysis.conflict
+        assert analysis.root_flags == ('-sS', '-O')
+        assert (analysis.safe, list(analysis.safety_errors), list(analysis.safety_warnings)) \
+            == check_safe_execution(command)
+    
+    def test_analysis_is_cached(self):
+        """Test repeated analysis of the same command is memoized"""
+        assert analyze_command("nmap -sV 10.0.0.1") is analyze_command("nmap -sV 10.0.0.1")
+
+
 # ============================================================================
 # Test Self-Correction
 # ============================================================================
@@ -216,6 +274,19 @@ class TestSelfCorrection:
         
         # Command should be different after correction
         assert result['command'] != bad_command or result['validation']['is_valid']
+    
+    def test_correction_stops_when_budget_spent(self):
+        """Test that an exhausted time budget stops retrying"""
+        corrector = SelfCorrector(max_retries=3)
+        result = corrector.loop(
+            "scan network",
+            "MEDIUM",
+            self.mock_generator,
+            self.mock_validator,
+            time_budget_ms=0
+        )
+        
+        assert len(result['history']) == 1
 
 
 # ============================================================================
@@ -285,6 +356,16 @@ class TestDecisionAgent:
             complexity="HARD"
         )
         assert conf2 < 0.5
+    
+    def test_decision_reads_like_dict(self):
+        """Test decision keeps the dict interface with lazy metadata"""
+        validation = {"valid": True, "score": 0.9, "errors": [], "warnings": ["w"]}
+        decision = make_decision("nmap -sV 192.168.1.1", validation)
+        
+        assert set(decision) == {'command', 'confidence', 'explanation', 'validation', 'metadata'}
+        assert decision['metadata']['has_warnings'] == True
+        assert decision.get('correction_history') is None
+        assert dict(decision)['command'] == "nmap -sV 192.168.1.1"
 
 
 # ============================================================================
@@ -333,6 +414,85 @@ class TestCompleteValidator:
         validator = CommandValidator()
         assert validator.quick_validation("nmap 192.168.1.1") == True
         assert validator.quick_validation("invalid") == False
+    
+    def test_cached_result_is_a_copy(self):
+        """Test mutating a result does not leak into the next call"""
+        validator = CommandValidator()
+        first = validator.full_validation("nmap > output.txt 192.168.1.1")
+        first['errors'].clear()
+        first['details']['safety']['errors'].clear()
+        
+        second = validator.full_validation("nmap > output.txt 192.168.1.1")
+        assert second['errors']
+        assert second['details']['safety']['errors']
+    
+    def test_fast_fail_skips_conflicts_on_syntax_error(self):
+        """Test syntax failures stop before the conflict check unless asked"""
+        validator = CommandValidator()
+        command = "nmap -sS -sT 999.1.1.1 | cat"
+        
+        fast = validator.full_validation(command)
+        assert 'conflicts' not in fast['details']
+        assert any('safety' in e.lower() for e in fast['errors'])
+        
+        full = validator.full_validation(command, fast_fail=False)
+        assert any('conflict' in e.lower() for e in full['errors'])
+
+
+# ============================================================================
+# Test VM Result Parsing
+# ============================================================================
+
+SCAN_XML = b"""<?xml version="1.0"?>
+<nmaprun scanner="nmap" args="nmap -sV -oX - 192.168.1.0/30">
+  <host><status state="up"/><address addr="192.168.1.1"/>
+    <ports>
+      <port protocol="tcp" portid="22"><state state="open"/><service name="ssh"/></port>
+      <port protocol="tcp" portid="80"><state state="open"/><service name="http"/></port>
+      <port protocol="tcp" portid="443"><state state="filtered"/></port>
+    </ports>
+  </host>
+  <host><status state="down"/><address addr="192.168.1.2"/></host>
+  <host><status state="up"/><address addr="192.168.1.3"/>
+    <ports>
+      <port protocol="tcp" portid="22"><state state="open"/><service name="ssh"/></port>
+      <port protocol="tcp" portid="25"><state state="closed"/></port>
+    </ports>
+  </host>
+  <runstats>
+    <finished time="1700000000" elapsed="4.21"/>
+    <hosts up="2" down="1" total="3"/>
+  </runstats>
+</nmaprun>
+"""
+
+
+class TestVMParsing:
+    """Test the single-pass parser against parse_xml + extract_scan_stats"""
+    
+    def test_parse_scan_matches_separate_parsers(self):
+        """Test score and stats of a 3-host scan"""
+        score, stats = parse_scan(SCAN_XML)
+        assert score == parse_xml(SCAN_XML)
+        assert stats == extract_scan_stats(SCAN_XML)
+        assert stats['services_detected'] == ['ssh', 'http']
+        assert (stats['ports_open'], stats['ports_filtered'], stats['ports_closed']) == (3, 1, 1)
+    
+    def test_accumulator_small_chunks(self):
+        """Test that results do not depend on how the XML is split"""
+        acc = _ScanAccumulator()
+        for start in range(0, len(SCAN_XML), 7):
+            acc.feed(SCAN_XML[start:start + 7])
+        acc.close()
+        assert acc.result() == parse_scan(SCAN_XML)
+    
+    def test_truncated_xml(self):
+        """Test output cut off mid-scan (e.g. nmap killed)"""
+        truncated = SCAN_XML[:len(SCAN_XML) // 2]
+        score, stats = parse_scan(truncated)
+        assert score == parse_xml(truncated) == 0.0
+        assert stats == extract_scan_stats(truncated)
+        assert parse_scan(b"") == (parse_xml(b""), extract_scan_stats(b""))
 
 
 # ============================================================================
@@ -364,6 +524,69 @@ class TestIntegration:
         assert pipeline.validator is not None
         assert pipeline.corrector is not None
 
+    def test_pipeline_cache_l1_and_l2(self):
+        """Test cached decisions, including the JSON round trip through Redis"""
+        redis = FakeRedis()
+        calls = []
+
+        def generator(intent, complexity):
+            calls.append(intent)
+            return "nmap -sS -sT 192.168.1.1"
+
+        pipeline = ValidationPipeline(cache_enabled=True, redis_client=redis)
+        first = pipeline.process("scan", "EASY", generator, cache_key="gen")
+        second = pipeline.process("scan", "EASY", generator, cache_key="gen")
+        attempts = len(calls)
+        assert second.to_dict() == first.to_dict()
+        assert len(redis.store) == 1
+
+        # L1 hits are copies: mutating one must not corrupt the cache
+        second.validation['errors'].append("mutated")
+        assert pipeline.process("scan", "EASY", generator, cache_key="gen").to_dict() == first.to_dict()
+
+        # With L1 empty, the decision is read back from Redis
+        pipeline._l1.clear()
+        from_redis = pipeline.process("scan", "EASY", generator, cache_key="gen")
+        assert len(calls) == attempts
+        assert from_redis.to_dict() == first.to_dict()
+        assert from_redis.correction_history == first.correction_history
+
+    def test_pipeline_cache_unnamed_generators(self):
+        """Test that distinct generators never share a cached decision"""
+        redis = FakeRedis()
+        pipeline = ValidationPipeline(cache_enabled=True, redis_client=redis)
+
+        first = pipeline.process("scan", "EASY", lambda i, c: "nmap -sV 192.168.1.1")
+        second = pipeline.process("scan", "EASY", lambda i, c: "nmap -sS 192.168.1.1")
+        assert first.command != second.command
+        assert redis.store == {}
+
+    def test_pipeline_cache_corrupt_redis_entry(self):
+        """Test that an unreadable Redis entry is treated as a miss"""
+        redis = FakeRedis()
+        pipeline = ValidationPipeline(cache_enabled=True, redis_client=redis)
+        key = pipeline._cache_key("scan", "EASY", None, "gen")
+
+        for blob in (b"not json", b"{}", b"[1, 2]"):
+            redis.store[key] = blob
+            pipeline.clear_cache()
+            decision = pipeline.process("scan", "EASY", lambda i, c: "nmap -sV 192.168.1.1",
+                                        cache_key="gen")
+            assert decision.command == "nmap -sV 192.168.1.1"
+
+
+class FakeRedis:
+    """In-memory stand-in for the two redis.Redis methods the pipeline uses"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value.encode() if isinstance(value, str) else value
+
 
 # ============================================================================
 # Run Tests